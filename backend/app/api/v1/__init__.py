@@ -3,10 +3,11 @@ API v1 package for the AI Email Campaign Writer backend.
 """
 
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from app.api.v1.endpoints import auth, users, campaigns, recipients, templates, ai, analytics, subscriptions, notifications
 
 # Create main API router
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include all endpoint routers
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
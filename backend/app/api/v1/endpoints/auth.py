@@ -2,30 +2,29 @@
 Authentication endpoints for login, registration, and token management.
 """
 
-from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.security import (
     authenticate_user,
-    create_access_token,
-    create_refresh_token,
-    get_password_hash,
-    verify_password
+    create_token_pair,
+    consume_refresh_token,
+    get_password_hash_async,
+    verify_refresh_token
 )
-from app.core.config import settings
+from app.core.redis import RedisClient, get_redis
 from app.models.user import User
 from app.schemas.auth import (
     Token,
     UserCreate,
-    UserLogin,
     PasswordReset,
     PasswordResetRequest
 )
-from app.services.email import EmailService
+from app.services.email_service import EmailService, get_email_service
 from app.services.user import UserService
 
 router = APIRouter()
@@ -38,9 +37,9 @@ async def register(
     """
     Register a new user account.
     """
-    # Check if user already exists
-    existing_user = await UserService.get_by_email(db, email=user_data.email)
-    if existing_user:
+    # Check if user already exists without loading the row
+    email_taken = await db.scalar(select(exists().where(User.email == user_data.email)))
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -50,14 +49,7 @@ async def register(
     user = await UserService.create_user(db, user_data)
     
     # Generate tokens
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    refresh_token = create_refresh_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    )
+    access_token, refresh_token = create_token_pair(user.id)
     
     return {
         "user": {
@@ -98,14 +90,7 @@ async def login(
     await UserService.update_last_login(db, user.id)
     
     # Generate tokens
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    refresh_token = create_refresh_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    )
+    access_token, refresh_token = create_token_pair(user.id)
     
     return {
         "user": {
@@ -123,15 +108,22 @@ async def login(
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     refresh_token: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis: RedisClient = Depends(get_redis)
 ) -> Any:
     """
     Refresh access token using refresh token.
     """
     try:
-        # Verify refresh token
-        user_id = verify_refresh_token(refresh_token)
-        user = await UserService.get_by_id(db, user_id)
+        # Verify the refresh token and claim its jti in one atomic step, so
+        # a replayed or concurrently reused token is rejected
+        claims = verify_refresh_token(refresh_token)
+        if not claims or not await consume_refresh_token(redis, claims):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+        user = await UserService.get_by_id(db, claims["sub"])
         
         if not user or not user.is_active:
             raise HTTPException(
@@ -139,15 +131,8 @@ async def refresh_token(
                 detail="Invalid refresh token"
             )
         
-        # Generate new tokens
-        new_access_token = create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-        new_refresh_token = create_refresh_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        )
+        # Rotate tokens; the used refresh token is already blacklisted
+        new_access_token, new_refresh_token = create_token_pair(user.id)
         
         return {
             "access_token": new_access_token,
@@ -163,14 +148,16 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(
     refresh_token: str,
-    db: AsyncSession = Depends(get_db)
+    redis: RedisClient = Depends(get_redis)
 ) -> Any:
     """
     Logout user and invalidate tokens.
     """
     try:
         # Invalidate refresh token (add to blacklist)
-        await UserService.invalidate_refresh_token(db, refresh_token)
+        claims = verify_refresh_token(refresh_token)
+        if claims:
+            await consume_refresh_token(redis, claims)
         return {"message": "Successfully logged out"}
     except Exception:
         # Even if token is invalid, return success to prevent enumeration
@@ -179,7 +166,8 @@ async def logout(
 @router.post("/forgot-password")
 async def forgot_password(
     request: PasswordResetRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    email_service: EmailService = Depends(get_email_service)
 ) -> Any:
     """
     Request password reset email.
@@ -190,7 +178,6 @@ async def forgot_password(
         reset_token = await UserService.create_password_reset_token(db, user.id)
         
         # Send password reset email
-        email_service = EmailService()
         await email_service.send_password_reset_email(
             email=user.email,
             name=user.first_name,
@@ -217,7 +204,7 @@ async def reset_password(
         )
     
     # Update password
-    hashed_password = get_password_hash(request.new_password)
+    hashed_password = await get_password_hash_async(request.new_password)
     await UserService.update_password(db, user.id, hashed_password)
     
     # Invalidate reset token
@@ -0,0 +1,35 @@
+"""
+Celery application for background tasks.
+"""
+
+from celery import Celery
+from app.core.config import settings
+
+celery_app = Celery(
+    "ai_email_campaign",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.campaigns", "app.tasks.events"]
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        "flush-email-events": {
+            "task": "app.tasks.events.flush_email_events",
+            "schedule": 5.0,
+        },
+        "maintain-email-event-partitions": {
+            "task": "app.tasks.events.maintain_email_event_partitions",
+            "schedule": 6 * 3600.0,
+        },
+        "refresh-campaign-analytics": {
+            "task": "app.tasks.campaigns.refresh_campaign_analytics",
+            "schedule": 300.0,
+        },
+    },
+)
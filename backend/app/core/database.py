@@ -2,19 +2,24 @@
 Database configuration and session management.
 """
 
+from datetime import date
 from typing import AsyncGenerator
+from sqlalchemy import func, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    poolclass=StaticPool,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,
-    pool_recycle=300,
+    pool_recycle=1800,
+    connect_args={"server_settings": {"jit": "off"}},
 )
 
 # Create async session factory
@@ -27,9 +32,18 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+# Column defaults evaluated by Postgres inside the INSERT, so bulk loads
+# don't pay for a Python uuid4()/utcnow() call per row
+UUID_SERVER_DEFAULT = func.gen_random_uuid()
+UTC_NOW = func.timezone("utc", func.now())
+
+
 class Base(DeclarativeBase):
     """Base class for all database models."""
-    pass
+    
+    # Server-generated values come back via RETURNING instead of expiring,
+    # since an implicit refresh can't run under the async session
+    __mapper_args__ = {"eager_defaults": True}
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -45,13 +59,46 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def init_db() -> None:
-    """Initialize database tables."""
+    """
+    Initialize database tables, partitions, triggers and views.
+    
+    Takes exclusive DDL locks, so it runs once per deploy from
+    ``scripts/init_db.py`` rather than in every worker's startup.
+    """
     async with engine.begin() as conn:
         # Import all models here to ensure they are registered
         from app.models import user, campaign, template, recipient, analytics
         
+        # Trigram operator classes for recipient name search
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+        
+        # Enum members added since the types were first created
+        await campaign.add_recipient_status_values(conn)
+        
+        # Campaign deletes cascade to their children in Postgres
+        await campaign.apply_campaign_foreign_key_actions(conn)
+        
+        # Hash partitions for campaign recipients
+        await campaign.create_campaign_recipient_partitions(conn)
+        
+        # Partitions for the coming week of email events
+        await analytics.create_email_event_partitions(conn, date.today())
+        
+        # Campaign counters follow email_events inserts inside Postgres
+        await analytics.create_email_event_counter_trigger(conn)
+        
+        # Dashboard aggregates over the campaign counters
+        await campaign.create_campaign_analytics_view(conn)
+
+
+async def warm_db_pool() -> None:
+    """Pre-create pooled connections so early requests skip connection setup."""
+    connections = [await engine.connect() for _ in range(settings.DATABASE_POOL_SIZE)]
+    for connection in connections:
+        await connection.close()
 
 
 async def close_db() -> None:
@@ -2,6 +2,7 @@
 Common dependencies for FastAPI endpoints.
 """
 
+import uuid
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -9,25 +10,48 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
 from app.core.database import get_db
+from app.core.middleware import RATE_LIMIT_PER_HOUR, RATE_LIMIT_PER_MINUTE, get_client_ip
 from app.core.security import verify_token
-from app.core.redis import get_redis, RedisClient
+from app.core.redis import get_redis, RedisClient, RATE_LIMIT_OK, RATE_LIMIT_SKIP_PATHS
 from app.services.ai_service import get_ai_service, AIService
 from app.services.email_service import get_email_service, EmailService
 from app.models.user import User
-from app.core.config import settings
 
 # Security scheme
 security = HTTPBearer()
 
+# Authorization scheme prefix; the token is sliced off rather than split out
+_BEARER = "Bearer "
+_BEARER_LEN = len(_BEARER)
+
+# Marks requests whose token UnifiedMiddleware has not looked at
+_NOT_VERIFIED = object()
+
+async def _get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+    """Load a user by primary key on the request session."""
+    try:
+        primary_key = uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+    
+    # Always read the row so deactivation and role/plan changes apply at once;
+    # repeated lookups within a request hit the session identity map
+    return await db.get(User, primary_key)
+
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Get current authenticated user from JWT token.
     
+    Reuses the subject decoded by ``UnifiedMiddleware`` when present
+    and only verifies the token itself as a fallback.
+    
     Args:
+        request: FastAPI request object
         credentials: HTTP Bearer token credentials
         db: Database session
         
@@ -38,8 +62,10 @@ async def get_current_user(
         HTTPException: If token is invalid or user not found
     """
     try:
-        # Verify token
-        user_id = verify_token(credentials.credentials)
+        # Verify token unless the middleware already did
+        user_id = getattr(request.state, "user_id", _NOT_VERIFIED)
+        if user_id is _NOT_VERIFIED:
+            user_id = verify_token(credentials.credentials)
         if not user_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,9 +74,7 @@ async def get_current_user(
             )
         
         # Get user from database
-        from sqlalchemy import select
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await _get_user_by_id(db, user_id)
         
         if not user:
             raise HTTPException(
@@ -125,6 +149,30 @@ async def get_current_admin_user(
     return current_user
 
 
+def require_permission(permission: str):
+    """
+    Build a dependency that checks a user permission.
+    
+    The check runs against the user row loaded for this request, so plan
+    and usage counter changes take effect on the next request.
+    
+    Args:
+        permission: Permission name understood by ``User.has_permission``
+        
+    Returns:
+        Dependency resolving to the current user when the check passes
+    """
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if not current_user.has_permission(permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+    
+    return dependency
+
+
 async def get_optional_current_user(
     request: Request,
     db: AsyncSession = Depends(get_db)
@@ -140,21 +188,22 @@ async def get_optional_current_user(
         Optional[User]: Current user if authenticated, None otherwise
     """
     try:
-        # Check for Authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return None
-        
-        token = auth_header.split(" ")[1]
-        user_id = verify_token(token)
+        # Reuse the subject decoded by UnifiedMiddleware when present
+        user_id = getattr(request.state, "user_id", _NOT_VERIFIED)
+        if user_id is _NOT_VERIFIED:
+            # Check for Authorization header
+            auth_header = request.headers.get("Authorization")
+            if not auth_header or not auth_header.startswith(_BEARER):
+                return None
+            
+            token = auth_header[_BEARER_LEN:]
+            user_id = verify_token(token)
         
         if not user_id:
             return None
         
         # Get user from database
-        from sqlalchemy import select
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await _get_user_by_id(db, user_id)
         
         if not user or not user.is_active:
             return None
@@ -177,74 +226,54 @@ def get_rate_limit_key(request: Request) -> str:
         str: Rate limit key
     """
     # Use client IP as rate limit key
-    client_ip = request.client.host if request.client else "unknown"
-    return f"rate_limit:{client_ip}"
+    return f"rl:{get_client_ip(request)}"
 
 
 async def check_rate_limit(
     request: Request,
+    rate_limit_key: str = Depends(get_rate_limit_key),
     redis: RedisClient = Depends(get_redis)
-) -> bool:
+) -> None:
     """
-    Check if request is within rate limits.
+    Enforce rate limits for the request.
+    
+    Endpoints and other dependencies should depend on this directly so
+    FastAPI's per-request dependency cache runs the Redis check once.
     
     Args:
         request: FastAPI request object
+        rate_limit_key: Rate limit key for the client
         redis: Redis client
         
-    Returns:
-        bool: True if within rate limits, False otherwise
+    Raises:
+        HTTPException: If rate limit exceeded
     """
+    # CORS preflights and probes don't count against client quotas
+    if request.method == "OPTIONS" or request.url.path in RATE_LIMIT_SKIP_PATHS:
+        return
+    
     try:
-        rate_limit_key = get_rate_limit_key(request)
-        
-        # Check minute rate limit
-        minute_count = await redis.get(f"{rate_limit_key}:minute")
-        if minute_count and int(minute_count) >= settings.RATE_LIMIT_PER_MINUTE:
-            return False
-        
-        # Check hour rate limit
-        hour_count = await redis.get(f"{rate_limit_key}:hour")
-        if hour_count and int(hour_count) >= settings.RATE_LIMIT_PER_HOUR:
-            return False
-        
-        # Increment counters
-        pipe = redis.client.pipeline()
-        pipe.incr(f"{rate_limit_key}:minute")
-        pipe.expire(f"{rate_limit_key}:minute", 60)
-        pipe.incr(f"{rate_limit_key}:hour")
-        pipe.expire(f"{rate_limit_key}:hour", 3600)
-        await pipe.execute()
-        
-        return True
-        
+        # Take a token from the minute and hour buckets in a single round-trip
+        result = await redis.consume_rate_limit(
+            rate_limit_key, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_PER_HOUR
+        )
     except Exception as e:
         logger.error(f"Error checking rate limit: {str(e)}")
         # Allow request if rate limiting fails
-        return True
-
-
-async def require_rate_limit(
-    request: Request,
-    redis: RedisClient = Depends(get_redis)
-):
-    """
-    Dependency to require rate limiting.
+        return
     
-    Args:
-        request: FastAPI request object
-        redis: Redis client
-        
-    Raises:
-        HTTPException: If rate limit exceeded
-    """
-    if not await check_rate_limit(request, redis):
+    # Allow request if rate limiting fails
+    if result is not None and result != RATE_LIMIT_OK:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded. Please try again later."
         )
 
 
+# Kept as an alias so Depends(require_rate_limit) shares check_rate_limit's cache entry
+require_rate_limit = check_rate_limit
+
+
 async def get_user_from_request(
     request: Request,
     db: AsyncSession = Depends(get_db)
@@ -268,9 +297,7 @@ async def get_user_from_request(
         # Try to get user from query parameter (for public endpoints)
         user_id = request.query_params.get("user_id")
         if user_id:
-            from sqlalchemy import select
-            result = await db.execute(select(User).where(User.id == user_id))
-            return result.scalar_one_or_none()
+            return await _get_user_by_id(db, user_id)
         
         return None
         
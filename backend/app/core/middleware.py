@@ -2,86 +2,198 @@
 Middleware for the FastAPI application.
 """
 
+import ipaddress
 import time
-import json
-from typing import Callable, Dict, Any
-from fastapi import Request, Response, HTTPException
+from functools import lru_cache
+from typing import Callable, Final
+import orjson
+from fastapi import Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from loguru import logger
 from app.core.config import settings
+from app.core.redis import (
+    RATE_LIMIT_HOUR_EXCEEDED,
+    RATE_LIMIT_MINUTE_EXCEEDED,
+    RATE_LIMIT_SKIP_PATHS
+)
 from app.core.security import verify_token
 
+# Public paths that never carry a bearer token worth verifying; auth
+# endpoints are matched by prefix so new ones don't need listing here
+_SKIP_PATHS = frozenset({"/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json", "/health"})
+_SKIP_PREFIXES = ("/api/v1/auth/",)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests and responses."""
+# Raw Authorization scheme prefix; the token is sliced off the header bytes
+_BEARER = b"Bearer "
+_BEARER_LEN = len(_BEARER)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+# Hot rate limit settings bound once; Settings is frozen so they can't drift
+RATE_LIMIT_PER_MINUTE: Final[int] = settings.RATE_LIMIT_PER_MINUTE
+RATE_LIMIT_PER_HOUR: Final[int] = settings.RATE_LIMIT_PER_HOUR
+
+# Requests slower than this are logged at INFO; the rest only at DEBUG
+SLOW_REQUEST_SECONDS: Final[float] = settings.SLOW_REQUEST_MS / 1000
+
+# Peers allowed to report the real client address via X-Forwarded-For
+_TRUSTED_PROXY_NETWORKS = tuple(
+    ipaddress.ip_network(cidr, strict=False) for cidr in settings.TRUSTED_PROXIES
+)
+
+# Health and metrics probes that UnifiedMiddleware passes straight through
+_UNLOGGED_PATHS = frozenset({"/health", "/metrics"})
+
+# Fixed error bodies, serialized once instead of on every rejected request
+_RATE_LIMIT_MINUTE_BODY = orjson.dumps({"detail": "Rate limit exceeded. Please try again later."})
+_RATE_LIMIT_HOUR_BODY = orjson.dumps({"detail": "Hourly rate limit exceeded. Please try again later."})
+_INTERNAL_ERROR = {"code": "INTERNAL_ERROR", "message": "An internal server error occurred"}
+_INTERNAL_ERROR_BODY = orjson.dumps({"error": _INTERNAL_ERROR})
+
+
+@lru_cache(maxsize=1024)
+def _is_trusted_proxy(host: str) -> bool:
+    """Check whether a peer address belongs to a trusted proxy network."""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _TRUSTED_PROXY_NETWORKS)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Get the client IP, honouring X-Forwarded-For only from trusted proxies.
+    
+    The header is walked from the right, skipping trusted proxy hops; the
+    first untrusted address is the client. Entries further left were
+    supplied by the client itself and are never used.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _TRUSTED_PROXY_NETWORKS or not _is_trusted_proxy(peer):
+        return peer
+    
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if not forwarded_for:
+        return peer
+    
+    client = peer
+    for hop in reversed(forwarded_for.split(",")):
+        hop = hop.strip()
+        if not hop:
+            continue
+        client = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return client
+
+
+class UnifiedMiddleware:
+    """
+    Pure ASGI middleware for logging, JWT authentication and error handling.
+
+    Does in one layer what separate ``BaseHTTPMiddleware`` classes would do
+    in three: decodes the bearer token straight from the raw ASGI headers
+    into ``scope["state"]["user_id"]`` so dependencies can read it via
+    ``request.state``, logs and times the request, and turns unhandled
+    exceptions into a 500 response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        if path not in _SKIP_PATHS and not path.startswith(_SKIP_PREFIXES):
+            self._authenticate(scope)
+        
+        # Probe endpoints are neither logged nor timed
+        if path in _UNLOGGED_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path} - "
-            f"Client: {request.client.host if request.client else 'unknown'}"
+        start_time = time.perf_counter()
+        
+        # Log request; arguments are only evaluated if the record is emitted
+        logger.opt(lazy=True).debug(
+            "Request: {} {} - Client: {}",
+            lambda: scope["method"],
+            lambda: path,
+            lambda: scope["client"][0] if scope.get("client") else "unknown"
         )
         
-        # Process request
+        status_code = None
+        process_time = 0.0
+        
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, process_time
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                
+                # Add process time header in milliseconds
+                process_time = time.perf_counter() - start_time
+                MutableHeaders(scope=message).append(
+                    "X-Process-Time", f"{process_time * 1000:.1f}"
+                )
+            await send(message)
+        
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            # Log response
-            logger.info(
-                f"Response: {response.status_code} - "
-                f"Process Time: {process_time:.4f}s"
+            await self.app(scope, receive, send_with_timing)
+        except Exception as e:
+            process_time = time.perf_counter() - start_time
+            logger.error(
+                "Unexpected error: {} - Path: {} - Method: {} - Process Time: {:.4f}s",
+                e, path, scope["method"], process_time
             )
             
-            # Add process time header
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
+            # The response is already on the wire; nothing left to replace
+            if status_code is not None:
+                raise
             
-        except Exception as e:
-            process_time = time.time() - start_time
-            logger.error(
-                f"Error: {str(e)} - "
-                f"Process Time: {process_time:.4f}s"
+            # Return 500 error in production, detailed error in development
+            if settings.DEBUG:
+                body = orjson.dumps({
+                    "error": {**_INTERNAL_ERROR, "detail": str(e), "type": type(e).__name__}
+                })
+            else:
+                body = _INTERNAL_ERROR_BODY
+            await Response(content=body, status_code=500, media_type="application/json")(
+                scope, receive, send
             )
-            raise
-
-
-class AuthenticationMiddleware(BaseHTTPMiddleware):
-    """Middleware for JWT token authentication."""
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip authentication for certain paths
-        skip_paths = {
-            "/docs", "/redoc", "/openapi.json", "/health",
-            "/api/v1/auth/login", "/api/v1/auth/register",
-            "/api/v1/auth/forgot-password", "/api/v1/auth/reset-password",
-            "/api/v1/auth/verify-email"
-        }
-        
-        if request.url.path in skip_paths:
-            return await call_next(request)
-        
-        # Check for Authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return await call_next(request)
+            return
         
-        token = auth_header.split(" ")[1]
-        user_id = verify_token(token)
-        
-        if user_id:
-            request.state.user_id = user_id
+        # Log response with the same duration reported in X-Process-Time;
+        # only slow requests are logged at INFO
+        if process_time >= SLOW_REQUEST_SECONDS:
+            logger.info(
+                "Slow response: {} {} {} - Process Time: {:.4f}s",
+                status_code, scope["method"], path, process_time
+            )
         else:
-            # Token is invalid but we don't block the request
-            # Let individual endpoints handle authentication
-            pass
+            logger.debug("Response: {} - Process Time: {:.4f}s", status_code, process_time)
+
+    @staticmethod
+    def _authenticate(scope: Scope) -> None:
+        # Check for Authorization header
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value
+                break
         
-        return await call_next(request)
+        if auth_header and auth_header.startswith(_BEARER):
+            # None marks a token that was checked and rejected, so dependencies
+            # don't verify it again. Invalid tokens are not blocked here;
+            # endpoints handle authentication.
+            scope.setdefault("state", {})["user_id"] = verify_token(
+                auth_header[_BEARER_LEN:].decode("latin-1")
+            )
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -92,38 +204,37 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         self.redis = redis_client
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+        # CORS preflights and probes don't count against client quotas
+        if request.method == "OPTIONS" or request.url.path in RATE_LIMIT_SKIP_PATHS:
+            return await call_next(request)
         
-        # Create rate limit keys
-        minute_key = f"rate_limit:{client_ip}:minute"
-        hour_key = f"rate_limit:{client_ip}:hour"
+        # Get client IP
+        client_ip = get_client_ip(request)
         
         try:
+            # Take a token from the minute and hour buckets in a single round-trip
+            result = await self.redis.consume_rate_limit(
+                f"rl:{client_ip}", RATE_LIMIT_PER_MINUTE, RATE_LIMIT_PER_HOUR
+            )
+            
             # Check minute rate limit
-            minute_count = await self.redis.get(minute_key)
-            if minute_count and int(minute_count) >= settings.RATE_LIMIT_PER_MINUTE:
-                return JSONResponse(
+            if result == RATE_LIMIT_MINUTE_EXCEEDED:
+                return Response(
+                    content=_RATE_LIMIT_MINUTE_BODY,
                     status_code=429,
-                    content={"detail": "Rate limit exceeded. Please try again later."}
+                    media_type="application/json",
+                    headers={"Retry-After": "60"}
                 )
             
             # Check hour rate limit
-            hour_count = await self.redis.get(hour_key)
-            if hour_count and int(hour_count) >= settings.RATE_LIMIT_PER_HOUR:
-                return JSONResponse(
+            if result == RATE_LIMIT_HOUR_EXCEEDED:
+                return Response(
+                    content=_RATE_LIMIT_HOUR_BODY,
                     status_code=429,
-                    content={"detail": "Hourly rate limit exceeded. Please try again later."}
+                    media_type="application/json",
+                    headers={"Retry-After": "3600"}
                 )
             
-            # Increment counters
-            pipe = self.redis.pipeline()
-            pipe.incr(minute_key)
-            pipe.expire(minute_key, 60)
-            pipe.incr(hour_key)
-            pipe.expire(hour_key, 3600)
-            await pipe.execute()
-            
         except Exception as e:
             logger.error(f"Rate limiting error: {str(e)}")
             # Continue without rate limiting if Redis is unavailable
@@ -131,66 +242,26 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return await call_next(request)
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """Middleware for handling and logging errors."""
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        try:
-            return await call_next(request)
-        except HTTPException as e:
-            # Log HTTP exceptions
-            logger.warning(
-                f"HTTP Exception: {e.status_code} - {e.detail} - "
-                f"Path: {request.url.path}"
-            )
-            raise
-        except Exception as e:
-            # Log unexpected exceptions
-            logger.error(
-                f"Unexpected error: {str(e)} - "
-                f"Path: {request.url.path} - "
-                f"Method: {request.method}"
-            )
-            
-            # Return 500 error in production, detailed error in development
-            if settings.DEBUG:
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "detail": "Internal server error",
-                        "error": str(e),
-                        "type": type(e).__name__
-                    }
-                )
-            else:
-                return JSONResponse(
-                    status_code=500,
-                    content={"detail": "Internal server error"}
-                )
-
-
 def setup_middleware(app):
     """Setup all middleware for the FastAPI application."""
     
-    # CORS middleware
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.BACKEND_CORS_ORIGINS,
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-    
     # Trusted host middleware
     app.add_middleware(
         TrustedHostMiddleware,
         allowed_hosts=["*"] if settings.DEBUG else ["localhost", "127.0.0.1"]
     )
     
-    # Custom middleware
-    app.add_middleware(LoggingMiddleware)
-    app.add_middleware(AuthenticationMiddleware)
-    app.add_middleware(ErrorHandlingMiddleware)
-    
     # Rate limiting middleware (requires Redis)
     # app.add_middleware(RateLimitMiddleware, redis_client=redis_client)
+    
+    # Logging, authentication and error handling in a single ASGI layer
+    app.add_middleware(UnifiedMiddleware)
+    
+    # CORS middleware; added last so it is the outermost layer
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=settings.ALLOWED_METHODS,
+        allow_headers=settings.ALLOWED_HEADERS,
+    )
@@ -2,12 +2,102 @@
 Redis connection and utilities for caching, sessions, and queues.
 """
 
-import json
-from typing import Any, Optional, Union
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 import redis.asyncio as redis
+import orjson
 from loguru import logger
 from app.core.config import settings
 import time
+import weakref
+
+
+# Rate limit results returned by the token bucket script
+RATE_LIMIT_OK = 0
+RATE_LIMIT_MINUTE_EXCEEDED = 1
+RATE_LIMIT_HOUR_EXCEEDED = 2
+
+# Keys scanned and unlinked per round-trip by Cache.clear_pattern
+CLEAR_BATCH_SIZE = 500
+
+# Probe and docs paths that are never rate limited
+RATE_LIMIT_SKIP_PATHS = frozenset({"/health", "/metrics", "/docs", "/redoc", "/openapi.json"})
+
+# Minute and hour token buckets stored in one hash per client and refilled
+# on read from Redis server time. ARGV: minute capacity, hour capacity.
+RATE_LIMIT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local minute_cap = tonumber(ARGV[1])
+local hour_cap = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'm', 'h', 'ts')
+local minute = tonumber(state[1]) or minute_cap
+local hour = tonumber(state[2]) or hour_cap
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+minute = math.min(minute_cap, minute + elapsed * minute_cap / 60000)
+hour = math.min(hour_cap, hour + elapsed * hour_cap / 3600000)
+local result = 0
+if minute < 1 then
+    result = 1
+elseif hour < 1 then
+    result = 2
+else
+    minute = minute - 1
+    hour = hour - 1
+end
+redis.call('HSET', KEYS[1], 'm', minute, 'h', hour, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 3600000)
+return result
+"""
+
+
+# First bytes a JSON document can start with; anything else is a raw string
+_JSON_START_BYTES = frozenset(b'{["-0123456789tfn')
+
+# Merges ARGV[1] (a JSON object) into the "data" field of the JSON session
+# stored at KEYS[1] and resets its TTL to ARGV[2]; returns 0 if the session
+# doesn't exist
+SESSION_UPDATE_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return 0 end
+local session = cjson.decode(raw)
+if type(session['data']) ~= 'table' then session['data'] = {} end
+for key, value in pairs(cjson.decode(ARGV[1])) do
+    session['data'][key] = value
+end
+redis.call('SET', KEYS[1], cjson.encode(session), 'EX', ARGV[2])
+return 1
+"""
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize to JSON bytes, which redis-py sends without re-encoding."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _guard(fallback: Callable[[], Any] = lambda: None):
+    """
+    Wrap a RedisClient command so Redis being down or erroring never raises.
+
+    The wrapped method only runs against a connected client; otherwise, and
+    on any error (which is logged), the result of ``fallback()`` is returned.
+    """
+    def decorator(method):
+        error_message = f"Redis {method.__name__} error: "
+        
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if self.client is None:
+                return fallback()
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as e:
+                logger.error(error_message + str(e))
+                return fallback()
+        return wrapper
+    return decorator
 
 
 class RedisClient:
@@ -16,22 +106,39 @@ class RedisClient:
     def __init__(self):
         self.redis_url = settings.REDIS_URL
         self.client: Optional[redis.Redis] = None
+        self._rate_limit_script = None
+        self._session_update_script = None
+        # Single-key commands issued in the same event loop tick, sent to
+        # Redis together in one pipeline on the next tick. Queued per loop:
+        # Celery tasks each run in a fresh loop and futures are loop-bound.
+        self._pending_commands: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._flush_tasks: set = set()
     
     async def connect(self):
         """Connect to Redis."""
         try:
-            self.client = redis.from_url(
+            # Explicitly sized pool so concurrent requests don't queue on the
+            # library default
+            pool = redis.ConnectionPool.from_url(
                 self.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                max_connections=settings.REDIS_POOL_SIZE,
+                # Replies stay as bytes: JSON payloads go straight to
+                # orjson, and hiredis parses them in C when installed
+                decode_responses=False,
                 socket_connect_timeout=5,
                 socket_timeout=5,
+                socket_keepalive=True,
                 retry_on_timeout=True,
                 health_check_interval=30,
             )
+            self.client = redis.Redis(connection_pool=pool)
             
             # Test connection
             await self.client.ping()
+            
+            # Scripts run via EVALSHA, re-loading only on NOSCRIPT
+            self._rate_limit_script = self.client.register_script(RATE_LIMIT_SCRIPT)
+            self._session_update_script = self.client.register_script(SESSION_UPDATE_SCRIPT)
             logger.info("Connected to Redis successfully")
             
         except Exception as e:
@@ -42,169 +149,169 @@ class RedisClient:
         """Disconnect from Redis."""
         if self.client:
             await self.client.close()
+            await self.client.connection_pool.disconnect()
             logger.info("Disconnected from Redis")
     
-    async def get(self, key: str) -> Optional[str]:
-        """Get value from Redis."""
+    def _coalesce(self, *command) -> asyncio.Future:
+        """Queue a command for this loop tick's shared pipeline."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending_commands.setdefault(loop, [])
+        pending.append((command, future))
+        if len(pending) == 1:
+            task = loop.create_task(self._flush_commands(loop))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        return future
+    
+    async def _flush_commands(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Send a loop's queued commands in one round-trip and resolve their futures."""
+        commands = self._pending_commands.pop(loop, [])
         try:
-            if self.client:
-                return await self.client.get(key)
+            if len(commands) == 1:
+                results = [await self.client.execute_command(*commands[0][0])]
+            else:
+                pipe = self.client.pipeline(transaction=False)
+                for command, _ in commands:
+                    pipe.execute_command(*command)
+                results = await pipe.execute(raise_on_error=False)
         except Exception as e:
-            logger.error(f"Redis get error: {str(e)}")
-        return None
+            results = [e] * len(commands)
+        except BaseException:
+            # Cancelled mid-flush (e.g. the loop is shutting down): no waiter
+            # may be left pending
+            for _, future in commands:
+                if not future.done():
+                    future.set_exception(redis.ConnectionError("Redis flush cancelled"))
+            raise
+        
+        for (_, future), result in zip(commands, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    @_guard()
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get value from Redis."""
+        return await self._coalesce("GET", key)
     
-    async def set(self, key: str, value: str, expire: Optional[int] = None) -> bool:
+    @_guard(lambda: False)
+    async def set(self, key: str, value: Union[bytes, str], expire: Optional[int] = None) -> bool:
         """Set value in Redis with optional expiration."""
-        try:
-            if self.client:
-                await self.client.set(key, value, ex=expire)
-                return True
-        except Exception as e:
-            logger.error(f"Redis set error: {str(e)}")
-        return False
+        if expire is not None:
+            await self._coalesce("SET", key, value, "EX", expire)
+        else:
+            await self._coalesce("SET", key, value)
+        return True
     
+    @_guard(lambda: False)
     async def delete(self, key: str) -> bool:
         """Delete key from Redis."""
-        try:
-            if self.client:
-                await self.client.delete(key)
-                return True
-        except Exception as e:
-            logger.error(f"Redis delete error: {str(e)}")
-        return False
+        await self.client.delete(key)
+        return True
     
+    @_guard(lambda: False)
     async def exists(self, key: str) -> bool:
         """Check if key exists in Redis."""
-        try:
-            if self.client:
-                return bool(await self.client.exists(key))
-        except Exception as e:
-            logger.error(f"Redis exists error: {str(e)}")
-        return False
+        return bool(await self.client.exists(key))
     
+    @_guard(lambda: False)
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration for key."""
-        try:
-            if self.client:
-                return bool(await self.client.expire(key, seconds))
-        except Exception as e:
-            logger.error(f"Redis expire error: {str(e)}")
-        return False
+        return bool(await self.client.expire(key, seconds))
     
+    @_guard()
     async def incr(self, key: str) -> Optional[int]:
         """Increment value in Redis."""
-        try:
-            if self.client:
-                return await self.client.incr(key)
-        except Exception as e:
-            logger.error(f"Redis incr error: {str(e)}")
-        return None
+        return await self.client.incr(key)
     
-    async def hget(self, name: str, key: str) -> Optional[str]:
+    @_guard()
+    async def hget(self, name: str, key: str) -> Optional[bytes]:
         """Get hash field value."""
-        try:
-            if self.client:
-                return await self.client.hget(name, key)
-        except Exception as e:
-            logger.error(f"Redis hget error: {str(e)}")
-        return None
+        return await self._coalesce("HGET", name, key)
     
+    @_guard(lambda: False)
     async def hset(self, name: str, key: str, value: str) -> bool:
         """Set hash field value."""
-        try:
-            if self.client:
-                await self.client.hset(name, key, value)
-                return True
-        except Exception as e:
-            logger.error(f"Redis hset error: {str(e)}")
-        return False
+        await self.client.hset(name, key, value)
+        return True
     
+    @_guard(dict)
     async def hgetall(self, name: str) -> dict:
         """Get all hash fields."""
-        try:
-            if self.client:
-                return await self.client.hgetall(name)
-        except Exception as e:
-            logger.error(f"Redis hgetall error: {str(e)}")
-        return {}
+        return await self.client.hgetall(name)
     
+    @_guard()
     async def lpush(self, name: str, *values) -> Optional[int]:
         """Push values to list from left."""
-        try:
-            if self.client:
-                return await self.client.lpush(name, *values)
-        except Exception as e:
-            logger.error(f"Redis lpush error: {str(e)}")
-        return None
+        return await self.client.lpush(name, *values)
     
-    async def rpop(self, name: str) -> Optional[str]:
+    @_guard()
+    async def rpop(self, name: str) -> Optional[bytes]:
         """Pop value from list from right."""
-        try:
-            if self.client:
-                return await self.client.rpop(name)
-        except Exception as e:
-            logger.error(f"Redis rpop error: {str(e)}")
-        return None
+        return await self.client.rpop(name)
     
+    @_guard(int)
     async def llen(self, name: str) -> int:
         """Get list length."""
-        try:
-            if self.client:
-                return await self.client.llen(name)
-        except Exception as e:
-            logger.error(f"Redis llen error: {str(e)}")
-        return 0
+        return await self.client.llen(name)
     
+    @_guard()
     async def sadd(self, name: str, *values) -> Optional[int]:
         """Add values to set."""
-        try:
-            if self.client:
-                return await self.client.sadd(name, *values)
-        except Exception as e:
-            logger.error(f"Redis sadd error: {str(e)}")
-        return None
+        return await self.client.sadd(name, *values)
     
+    @_guard()
     async def srem(self, name: str, *values) -> Optional[int]:
         """Remove values from set."""
-        try:
-            if self.client:
-                return await self.client.srem(name, *values)
-        except Exception as e:
-            logger.error(f"Redis srem error: {str(e)}")
-        return None
+        return await self.client.srem(name, *values)
     
+    @_guard(set)
     async def smembers(self, name: str) -> set:
         """Get all set members."""
-        try:
-            if self.client:
-                return await self.client.smembers(name)
-        except Exception as e:
-            logger.error(f"Redis smembers error: {str(e)}")
-        return set()
+        return await self.client.smembers(name)
     
+    @_guard()
     async def zadd(self, name: str, mapping: dict) -> Optional[int]:
         """Add values to sorted set."""
-        try:
-            if self.client:
-                return await self.client.zadd(name, mapping)
-        except Exception as e:
-            logger.error(f"Redis zadd error: {str(e)}")
-        return None
+        return await self.client.zadd(name, mapping)
     
+    @_guard(list)
     async def zrange(self, name: str, start: int, end: int, desc: bool = False) -> list:
         """Get range from sorted set."""
+        return await self.client.zrange(name, start, end, desc=desc)
+    
+    @_guard(lambda: False)
+    async def merge_session_data(self, key: str, data: dict, expire: int) -> bool:
+        """Merge into a stored session's data and reset its TTL in one round-trip."""
+        return bool(await self._session_update_script(
+            keys=[key], args=[_dumps(data), expire]
+        ))
+    
+    async def consume_rate_limit(self, key: str, per_minute: int, per_hour: int) -> Optional[int]:
+        """Take one token from a client's rate limit buckets in one round-trip."""
         try:
-            if self.client:
-                return await self.client.zrange(name, start, end, desc=desc)
+            if self._rate_limit_script:
+                return int(await self._rate_limit_script(keys=[key], args=[per_minute, per_hour]))
         except Exception as e:
-            logger.error(f"Redis zrange error: {str(e)}")
-        return []
-    
-    async def pipeline(self):
-        """Get Redis pipeline for batch operations."""
-        if self.client:
-            return self.client.pipeline()
+            logger.error(f"Redis rate limit error: {str(e)}")
         return None
+    
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[Any]:
+        """Queue commands on a pipeline, executed on exit and discarded on error."""
+        if not self.client:
+            raise redis.ConnectionError("Redis client is not connected")
+        pipe = self.client.pipeline(transaction=transaction)
+        try:
+            yield pipe
+            await pipe.execute()
+        except Exception:
+            await pipe.reset()
+            raise
 
 
 # Global Redis client instance
@@ -225,31 +332,72 @@ class Cache:
     
     async def get(self, key: str) -> Optional[Any]:
         """Get cached value."""
-        value = await self.redis.get(key)
-        if value:
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
-        return None
+        return self._decode(await self.redis.get(key))
     
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Set cached value."""
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
-        return await self.redis.set(key, str(value), expire)
+        return await self.redis.set(key, self._encode(value), expire)
     
     async def delete(self, key: str) -> bool:
         """Delete cached value."""
         return await self.redis.delete(key)
     
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several cached values in one round-trip."""
+        try:
+            if self.redis.client and keys:
+                values = await self.redis.client.mget(keys)
+                return [self._decode(value) for value in values]
+        except Exception as e:
+            logger.error(f"Cache mget error: {str(e)}")
+        return [None] * len(keys)
+    
+    async def mset(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """Set several cached values in one pipelined round-trip of SET ... EX."""
+        try:
+            if self.redis.client and mapping:
+                async with self.redis.pipeline() as pipe:
+                    for key, value in mapping.items():
+                        pipe.set(key, self._encode(value), ex=expire)
+                return True
+        except Exception as e:
+            logger.error(f"Cache mset error: {str(e)}")
+        return False
+    
+    @staticmethod
+    def _encode(value: Any) -> Union[bytes, str]:
+        """Serialize a value the way set() stores it."""
+        if isinstance(value, (dict, list)):
+            return _dumps(value)
+        return str(value)
+    
+    @staticmethod
+    def _decode(value: Optional[bytes]) -> Optional[Any]:
+        """Deserialize a value the way get() reads it."""
+        if value:
+            # Plain strings can't be JSON, so skip the failed parse entirely
+            if value[0] not in _JSON_START_BYTES:
+                return value.decode()
+            try:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return value.decode()
+        return None
+    
     async def clear_pattern(self, pattern: str) -> bool:
         """Clear all keys matching pattern."""
         try:
             if self.redis.client:
-                keys = await self.redis.client.keys(pattern)
-                if keys:
-                    await self.redis.client.delete(*keys)
+                # Incremental SCAN instead of KEYS so Redis isn't blocked, and
+                # UNLINK so memory is reclaimed off the main thread
+                batch = []
+                async for key in self.redis.client.scan_iter(match=pattern, count=CLEAR_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= CLEAR_BATCH_SIZE:
+                        await self.redis.client.unlink(*batch)
+                        batch.clear()
+                if batch:
+                    await self.redis.client.unlink(*batch)
                 return True
         except Exception as e:
             logger.error(f"Cache clear pattern error: {str(e)}")
@@ -273,7 +421,7 @@ class SessionManager:
             "created_at": int(time.time()),
             "data": data or {}
         }
-        await self.redis.set(session_id, json.dumps(session_data), self.default_expire)
+        await self.redis.set(session_id, _dumps(session_data), self.default_expire)
         return session_id
     
     async def get_session(self, session_id: str) -> Optional[dict]:
@@ -281,18 +429,14 @@ class SessionManager:
         data = await self.redis.get(session_id)
         if data:
             try:
-                return json.loads(data)
-            except json.JSONDecodeError:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
                 return None
         return None
     
     async def update_session(self, session_id: str, data: dict) -> bool:
-        """Update session data."""
-        session = await self.get_session(session_id)
-        if session:
-            session["data"].update(data)
-            return await self.redis.set(session_id, json.dumps(session), self.default_expire)
-        return False
+        """Update session data atomically on the Redis side."""
+        return await self.redis.merge_session_data(session_id, data, self.default_expire)
     
     async def delete_session(self, session_id: str) -> bool:
         """Delete session."""
@@ -315,8 +459,10 @@ class Queue:
         """Add item to queue."""
         try:
             if isinstance(data, (dict, list)):
-                data = json.dumps(data)
-            await self.redis.lpush(self.queue_name, str(data))
+                data = _dumps(data)
+            else:
+                data = str(data)
+            await self.redis.lpush(self.queue_name, data)
             return True
         except Exception as e:
             logger.error(f"Queue enqueue error: {str(e)}")
@@ -328,9 +474,9 @@ class Queue:
             data = await self.redis.rpop(self.queue_name)
             if data:
                 try:
-                    return json.loads(data)
-                except json.JSONDecodeError:
-                    return data
+                    return orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    return data.decode()
         except Exception as e:
             logger.error(f"Queue dequeue error: {str(e)}")
         return None
@@ -342,3 +488,114 @@ class Queue:
     async def clear(self) -> bool:
         """Clear queue."""
         return await self.redis.delete(self.queue_name)
+
+
+# Stream utilities
+class EventStream:
+    """Append-only event stream using Redis Streams and a consumer group."""
+    
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        stream_name: str,
+        group_name: str,
+        max_length: int = 1_000_000
+    ):
+        self.redis = redis_client
+        self.stream_name = stream_name
+        self.group_name = group_name
+        self.max_length = max_length
+        self.dead_letter_name = f"{stream_name}:dead"
+    
+    async def add_batch(self, events: List[dict]) -> int:
+        """Append events to the stream in one pipelined round-trip."""
+        try:
+            if self.redis.client and events:
+                async with self.redis.pipeline() as pipe:
+                    for event in events:
+                        pipe.xadd(
+                            self.stream_name,
+                            {"data": _dumps(event)},
+                            maxlen=self.max_length,
+                            approximate=True
+                        )
+                return len(events)
+        except Exception as e:
+            logger.error(f"Event stream add error: {str(e)}")
+        return 0
+    
+    async def ensure_group(self) -> None:
+        """Create the consumer group (and stream) if it doesn't exist yet."""
+        try:
+            await self.redis.client.xgroup_create(
+                self.stream_name, self.group_name, id="0", mkstream=True
+            )
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    async def read_batch(
+        self, consumer: str, count: int = 1000, block: int = 100, pending: bool = False
+    ) -> List[Tuple[bytes, dict]]:
+        """
+        Read up to ``count`` events for this consumer as (id, event) pairs.
+        
+        With ``pending`` set, re-reads entries already delivered to this
+        consumer but never acknowledged instead of new ones.
+        """
+        response = await self.redis.client.xreadgroup(
+            self.group_name,
+            consumer,
+            {self.stream_name: "0" if pending else ">"},
+            count=count,
+            block=None if pending else block
+        )
+        events = []
+        for _, entries in response or []:
+            for entry_id, fields in entries:
+                try:
+                    events.append((entry_id, orjson.loads(fields[b"data"])))
+                except (KeyError, TypeError, orjson.JSONDecodeError):
+                    logger.error(f"Dropping malformed stream entry {entry_id}")
+                    events.append((entry_id, None))
+        return events
+    
+    async def ack(self, entry_ids: List[bytes]) -> int:
+        """Acknowledge processed entries and trim them from the stream."""
+        if not entry_ids:
+            return 0
+        pipe = self.redis.client.pipeline(transaction=False)
+        pipe.xack(self.stream_name, self.group_name, *entry_ids)
+        pipe.xdel(self.stream_name, *entry_ids)
+        acked, _ = await pipe.execute()
+        return acked
+    
+    async def claim_idle(self, consumer: str, min_idle_ms: int, count: int = 1000) -> int:
+        """
+        Take over entries another consumer left unacknowledged for ``min_idle_ms``.
+        
+        Claimed entries join this consumer's pending list and come back from
+        ``read_batch(consumer, pending=True)``.
+        """
+        entry_ids = await self.redis.client.xautoclaim(
+            self.stream_name, self.group_name, consumer, min_idle_ms, count=count, justid=True
+        )
+        return len(entry_ids)
+    
+    async def dead_letter(self, entries: List[Tuple[bytes, Any, str]]) -> int:
+        """
+        Move (id, event, error) entries that can never be processed to the
+        dead-letter stream, then acknowledge them.
+        """
+        if not entries:
+            return 0
+        pipe = self.redis.client.pipeline(transaction=False)
+        for entry_id, event, error in entries:
+            pipe.xadd(
+                self.dead_letter_name,
+                {"id": entry_id, "data": _dumps(event), "error": error},
+                maxlen=self.max_length,
+                approximate=True
+            )
+        await pipe.execute()
+        return await self.ack([entry_id for entry_id, _, _ in entries])
@@ -2,14 +2,44 @@
 Security utilities for authentication and authorization.
 """
 
+import asyncio
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Union, Optional, Tuple
+from cachetools import TTLCache
 from jose import JWTError, jwt
+from loguru import logger
 from passlib.context import CryptContext
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
+from app.core.redis import RedisClient
+from app.models.user import User
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified access token claims keyed by token hash; exp is re-checked on every hit
+_token_claims_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# Hashes of tokens that failed verification, kept apart so a flood of bogus
+# tokens is rejected without crypto work and can't evict valid claims
+_bad_tokens: TTLCache = TTLCache(maxsize=20000, ttl=60)
+
+# Login lookup, built once and executed with the email bound per call
+_USER_BY_EMAIL_STMT = select(User).where(User.email == bindparam("email"))
+
+# Redis key prefix for revoked refresh token IDs
+REFRESH_BLACKLIST_PREFIX = "blacklist:"
+
+# Password hashing context; argon2id for new hashes, bcrypt kept for existing ones
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=2,
+)
 
 
 def create_access_token(
@@ -42,16 +72,111 @@ def create_refresh_token(
     return encoded_jwt
 
 
+def _token_cache_key(token: str) -> bytes:
+    """Get a compact cache key for a raw JWT."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _decode_token_claims(token: str) -> Optional[Tuple[str, Optional[float], Optional[str]]]:
+    """Verify JWT signature once per token and return (subject, exp, type)."""
+    key = _token_cache_key(token)
+    if key in _bad_tokens:
+        return None
+    if key in _token_claims_cache:
+        return _token_claims_cache[key]
+    
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        payload = {}
+    
+    subject = payload.get("sub")
+    if subject is None:
+        _bad_tokens[key] = True
+        return None
+    
+    claims = (subject, payload.get("exp"), payload.get("type"))
+    _token_claims_cache[key] = claims
+    return claims
+
+
 def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return subject."""
+    """Verify an access token and return its subject."""
+    claims = _decode_token_claims(token)
+    if claims is None:
+        return None
+    subject, exp, token_type = claims
+    # Refresh, reset and verification tokens share the signing key but
+    # must never authenticate a request
+    if token_type != "access":
+        _bad_tokens[_token_cache_key(token)] = True
+        return None
+    # Cached claims outlive the token, so expiry is re-checked on every hit
+    if exp is not None and exp <= time.time():
+        _bad_tokens[_token_cache_key(token)] = True
+        return None
+    return subject
+
+
+def create_token_pair(subject: Union[str, Any]) -> Tuple[str, str]:
+    """Create an access and refresh token pair sharing one timestamp."""
+    now = datetime.utcnow()
+    subject = str(subject)
+    secret_key = settings.SECRET_KEY
+    algorithm = settings.ALGORITHM
+    
+    access_token = jwt.encode(
+        {
+            "exp": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            "sub": subject,
+            "type": "access",
+        },
+        secret_key,
+        algorithm=algorithm,
+    )
+    refresh_token = jwt.encode(
+        {
+            "exp": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            "sub": subject,
+            "type": "refresh",
+            "jti": uuid.uuid4().hex,
+        },
+        secret_key,
+        algorithm=algorithm,
+    )
+    return access_token, refresh_token
+
+
+def verify_refresh_token(token: str) -> Optional[dict]:
+    """Verify a refresh token and return its claims."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        subject: str = payload.get("sub")
-        if subject is None:
-            return None
-        return subject
     except JWTError:
         return None
+    if payload.get("type") != "refresh" or not payload.get("sub") or not payload.get("jti"):
+        return None
+    return payload
+
+
+async def consume_refresh_token(redis: RedisClient, claims: dict) -> bool:
+    """
+    Mark a refresh token's jti as used, atomically.
+    
+    A single ``SET NX EX`` both checks and blacklists the jti, so of two
+    concurrent requests with the same token only one can win. Returns False
+    when the token was already used, has expired, or Redis can't be
+    reached; revocation fails closed.
+    """
+    remaining = int(claims["exp"] - time.time())
+    if remaining <= 0 or redis.client is None:
+        return False
+    try:
+        return bool(await redis.client.set(
+            f"{REFRESH_BLACKLIST_PREFIX}{claims['jti']}", "1", nx=True, ex=remaining
+        ))
+    except Exception as e:
+        logger.error(f"Error consuming refresh token: {str(e)}")
+        return False
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -64,6 +189,45 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so hashing doesn't block the event loop."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in a worker thread, returning (valid, new_hash).
+    
+    ``new_hash`` is set when the stored hash uses a deprecated scheme or
+    outdated parameters and should replace it.
+    """
+    return await asyncio.to_thread(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in a worker thread so hashing doesn't block the event loop."""
+    return await asyncio.to_thread(get_password_hash, password)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate a user by email and password."""
+    result = await db.execute(_USER_BY_EMAIL_STMT, {"email": email})
+    user = result.scalar_one_or_none()
+    if not user:
+        return None
+    
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
+        return None
+    # Upgrade bcrypt and outdated argon2 hashes while the plaintext is at hand
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+    return user
+
+
 def generate_password_reset_token(email: str) -> str:
     """Generate password reset token."""
     delta = timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -2,29 +2,76 @@
 Main FastAPI application entry point.
 """
 
+import asyncio
 import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status
+from typing import Optional, Tuple
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from loguru import logger
+import orjson
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 import logging
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from sqlalchemy import text
+
+from app.core.database import engine, close_db, warm_db_pool
+from app.core.redis import redis_client
+from app.core.middleware import UnifiedMiddleware
 from app.api.v1 import api_router
 from app.services.ai import AIService
 from app.services.email import EmailService
-from app.core.security import get_current_user_optional
+
+# Settings read by request handlers, bound once at import
+_VERSION = settings.VERSION
+_ENVIRONMENT = settings.ENVIRONMENT
+_IS_DEVELOPMENT = _ENVIRONMENT == "development"
+
+# Static endpoint payloads, serialized once
+_CONFIG_BODY = orjson.dumps({
+    "features": {
+        "ai_generation": True,
+        "a_b_testing": True,
+        "advanced_analytics": True
+    },
+    "limits": {
+        "max_campaigns": 100,
+        "max_subscribers": 10000,
+        "max_ai_generations": 1000
+    },
+    "supported_providers": {
+        "email": ["sendgrid", "smtp", "ses"],
+        "ai": ["openai", "anthropic"]
+    }
+})
+_ROOT_BODY = orjson.dumps({
+    "message": "AI Email Campaign Writer API",
+    "version": _VERSION,
+    "docs": "/docs" if _IS_DEVELOPMENT else None
+})
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    "error": {
+        "code": "INTERNAL_ERROR",
+        "message": "An internal server error occurred"
+    }
+})
+
+# Health probe results are shared by all /health requests for this long
+_HEALTH_TTL_SECONDS = 1.0
+_HEALTH_PROBE_TIMEOUT_SECONDS = 0.5
+_health_cache = {"checked_at": 0.0, "body": b"", "status_code": 200}
+_health_lock: Optional[asyncio.Lock] = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
-logger.add("logs/app.log", rotation="500 MB", retention="10 days", level="INFO")
+# File writes and rotation run on loguru's background queue thread, not the event loop
+logger.add("logs/app.log", rotation="500 MB", retention="10 days", level="INFO", enqueue=True)
 
 
 @asynccontextmanager
@@ -33,9 +80,18 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting AI Email Campaign Writer API...")
     
-    # Initialize database
-    await init_db()
-    logger.info("Database initialized successfully")
+    # Credentials load lazily; resolve them now so a misconfigured deploy fails fast
+    settings.secrets
+    
+    # Schema setup runs separately via scripts/init_db.py
+    await warm_db_pool()
+    logger.info("Database pool ready")
+    
+    # Initialize Redis; caching and rate limiting degrade gracefully without it
+    try:
+        await redis_client.connect()
+    except Exception:
+        logger.warning("Starting without Redis")
     
     # Initialize services
     await AIService.initialize()
@@ -48,6 +104,42 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down AI Email Campaign Writer API...")
     await close_db()
     logger.info("Database connection closed")
+    await redis_client.disconnect()
+
+
+async def _probe_database() -> None:
+    """Check that a pooled database connection can run a query."""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _probe_redis() -> None:
+    """Check that Redis answers a ping."""
+    if redis_client.client is None:
+        raise RuntimeError("Redis is not connected")
+    await redis_client.client.ping()
+
+
+async def _run_health_probes() -> Tuple[bytes, int]:
+    """Probe dependencies concurrently and build the /health response."""
+    probes = {"database": _probe_database, "redis": _probe_redis}
+    results = await asyncio.gather(
+        *(asyncio.wait_for(probe(), _HEALTH_PROBE_TIMEOUT_SECONDS) for probe in probes.values()),
+        return_exceptions=True
+    )
+    services = {
+        name: "unhealthy" if isinstance(result, BaseException) else "healthy"
+        for name, result in zip(probes, results)
+    }
+    healthy = all(state == "healthy" for state in services.values())
+    body = orjson.dumps({
+        "status": "healthy" if healthy else "unhealthy",
+        "timestamp": time.time(),
+        "version": _VERSION,
+        "environment": _ENVIRONMENT,
+        "services": services
+    })
+    return body, 200 if healthy else 503
 
 
 def create_application() -> FastAPI:
@@ -60,6 +152,7 @@ def create_application() -> FastAPI:
         docs_url="/docs" if settings.ENVIRONMENT == "development" else None,
         redoc_url="/redoc" if settings.ENVIRONMENT == "development" else None,
         openapi_url="/openapi.json" if settings.ENVIRONMENT == "development" else None,
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
 
@@ -69,120 +162,82 @@ def create_application() -> FastAPI:
         allowed_hosts=settings.ALLOWED_HOSTS
     )
 
-    # CORS middleware
+    # Request logging, timing and authentication
+    app.add_middleware(UnifiedMiddleware)
+
+    # CORS middleware; added last so it wraps everything and its headers
+    # reach the error responses UnifiedMiddleware builds too
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.ALLOWED_ORIGINS,
         allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_methods=settings.ALLOWED_METHODS,
+        allow_headers=settings.ALLOWED_HEADERS,
     )
 
-    # Request timing middleware
-    @app.middleware("http")
-    async def add_process_time_header(request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-
-    # Request logging middleware
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        logger.info(f"Request: {request.method} {request.url}")
-        
-        response = await call_next(request)
-        
-        # Log response
-        process_time = time.time() - start_time
-        logger.info(f"Response: {response.status_code} - {process_time:.3f}s")
-        
-        return response
-
     # Exception handlers
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         logger.error(f"Validation error: {exc.errors()}")
-        return JSONResponse(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content={
+        # Pydantic error contexts can hold exception instances; fall back to str
+        body = orjson.dumps(
+            {
                 "error": {
                     "code": "VALIDATION_ERROR",
                     "message": "Request validation failed",
                     "details": exc.errors()
                 }
-            }
+            },
+            default=str
+        )
+        return Response(
+            content=body,
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            media_type="application/json"
         )
 
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
         logger.error(f"Unhandled exception: {str(exc)}")
-        return JSONResponse(
+        return Response(
+            content=_INTERNAL_ERROR_BODY,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "error": {
-                    "code": "INTERNAL_ERROR",
-                    "message": "An internal server error occurred"
-                }
-            }
+            media_type="application/json"
         )
 
     # Include API routes
     app.include_router(api_router, prefix="/api/v1")
 
-    # TODO: Implement comprehensive health check
-    # This should check:
-    # - Database connectivity and query performance
-    # - Redis connectivity and cache operations
-    # - External API health (OpenAI, Anthropic, SendGrid)
-    # - Background job queue status
-    # - Disk space and memory usage
     @app.get("/health")
     async def health_check():
-        return {
-            "status": "healthy",
-            "timestamp": time.time(),
-            "version": settings.VERSION,
-            "environment": settings.ENVIRONMENT,
-            "services": {
-                "database": "healthy",
-                "redis": "healthy",
-                "email_service": "healthy"
-            }
-        }
+        global _health_lock
+        
+        # Serve the last probe while it is fresh; only one request re-probes
+        if time.monotonic() - _health_cache["checked_at"] >= _HEALTH_TTL_SECONDS:
+            if _health_lock is None:
+                _health_lock = asyncio.Lock()
+            async with _health_lock:
+                if time.monotonic() - _health_cache["checked_at"] >= _HEALTH_TTL_SECONDS:
+                    body, status_code = await _run_health_probes()
+                    _health_cache.update(
+                        checked_at=time.monotonic(), body=body, status_code=status_code
+                    )
+        
+        return Response(
+            content=_health_cache["body"],
+            status_code=_health_cache["status_code"],
+            media_type="application/json"
+        )
 
     # Configuration endpoint
     @app.get("/config")
     async def get_config():
-        return {
-            "features": {
-                "ai_generation": True,
-                "a_b_testing": True,
-                "advanced_analytics": True
-            },
-            "limits": {
-                "max_campaigns": 100,
-                "max_subscribers": 10000,
-                "max_ai_generations": 1000
-            },
-            "supported_providers": {
-                "email": ["sendgrid", "smtp", "ses"],
-                "ai": ["openai", "anthropic"]
-            }
-        }
+        return Response(content=_CONFIG_BODY, media_type="application/json")
 
     # Root endpoint
     @app.get("/")
     async def root():
-        return {
-            "message": "AI Email Campaign Writer API",
-            "version": settings.VERSION,
-            "docs": "/docs" if settings.ENVIRONMENT == "development" else None
-        }
+        return Response(content=_ROOT_BODY, media_type="application/json")
 
     return app
 
@@ -195,5 +250,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.ENVIRONMENT == "development",
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
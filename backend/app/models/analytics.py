@@ -2,13 +2,20 @@
 Analytics model for tracking campaign performance and user analytics.
 """
 
-from datetime import datetime
+from datetime import date, timedelta
 from typing import Optional
-from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer, Float
+from loguru import logger
+from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float, Index, Computed, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from app.core.database import Base
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from app.core.database import Base, UTC_NOW, UUID_SERVER_DEFAULT
+
+
+def _percent_of(part: str, whole: str) -> str:
+    """SQL for a generated percentage column; 0 until the whole is non-zero."""
+    return f"CASE WHEN {whole} > 0 THEN {part} * 100.0 / {whole} ELSE 0 END"
 
 
 class CampaignAnalytics(Base):
@@ -16,8 +23,8 @@ class CampaignAnalytics(Base):
     
     __tablename__ = "campaign_analytics"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), index=True, nullable=False)
     
     # Delivery statistics
     total_sent = Column(Integer, default=0, nullable=False)
@@ -28,13 +35,13 @@ class CampaignAnalytics(Base):
     total_unsubscribed = Column(Integer, default=0, nullable=False)
     total_complained = Column(Integer, default=0, nullable=False)
     
-    # Rate calculations
-    delivery_rate = Column(Float, default=0.0, nullable=False)
-    open_rate = Column(Float, default=0.0, nullable=False)
-    click_rate = Column(Float, default=0.0, nullable=False)
-    bounce_rate = Column(Float, default=0.0, nullable=False)
-    unsubscribe_rate = Column(Float, default=0.0, nullable=False)
-    complaint_rate = Column(Float, default=0.0, nullable=False)
+    # Rate calculations, computed by Postgres whenever the counters change
+    delivery_rate = Column(Float, Computed(_percent_of("total_delivered", "total_sent"), persisted=True))
+    open_rate = Column(Float, Computed(_percent_of("unique_opens", "total_delivered"), persisted=True))
+    click_rate = Column(Float, Computed(_percent_of("unique_clicks", "total_delivered"), persisted=True))
+    bounce_rate = Column(Float, Computed(_percent_of("total_bounced", "total_sent"), persisted=True))
+    unsubscribe_rate = Column(Float, Computed(_percent_of("total_unsubscribed", "total_delivered"), persisted=True))
+    complaint_rate = Column(Float, Computed(_percent_of("total_complained", "total_delivered"), persisted=True))
     
     # Engagement metrics
     unique_opens = Column(Integer, default=0, nullable=False)
@@ -42,29 +49,19 @@ class CampaignAnalytics(Base):
     total_clicks = Column(Integer, default=0, nullable=False)
     
     # Geographic and device data
-    geographic_data = Column(JSON, default=dict, nullable=False)
-    device_data = Column(JSON, default=dict, nullable=False)
-    client_data = Column(JSON, default=dict, nullable=False)
+    geographic_data = Column(JSONB, default=dict, nullable=False)
+    device_data = Column(JSONB, default=dict, nullable=False)
+    client_data = Column(JSONB, default=dict, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     
     # Relationships
     campaign = relationship("Campaign", back_populates="analytics")
     
     def __repr__(self) -> str:
         return f"<CampaignAnalytics(campaign_id={self.campaign_id})>"
-    
-    def calculate_rates(self) -> None:
-        """Calculate all rate metrics."""
-        if self.total_sent > 0:
-            self.delivery_rate = (self.total_delivered / self.total_sent) * 100
-            self.open_rate = (self.unique_opens / self.total_delivered) * 100 if self.total_delivered > 0 else 0
-            self.click_rate = (self.unique_clicks / self.total_delivered) * 100 if self.total_delivered > 0 else 0
-            self.bounce_rate = (self.total_bounced / self.total_sent) * 100
-            self.unsubscribe_rate = (self.total_unsubscribed / self.total_delivered) * 100 if self.total_delivered > 0 else 0
-            self.complaint_rate = (self.total_complained / self.total_delivered) * 100 if self.total_delivered > 0 else 0
 
 
 class UserAnalytics(Base):
@@ -72,8 +69,8 @@ class UserAnalytics(Base):
     
     __tablename__ = "user_analytics"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # Usage statistics
     total_campaigns_created = Column(Integer, default=0, nullable=False)
@@ -99,8 +96,8 @@ class UserAnalytics(Base):
     total_spent = Column(Float, default=0.0, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     
     # Relationships
     user = relationship("User")
@@ -114,22 +111,30 @@ class EmailEvent(Base):
     
     __tablename__ = "email_events"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
-    recipient_id = Column(UUID(as_uuid=True), ForeignKey("recipients.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False)
+    recipient_id = Column(UUID(as_uuid=True), ForeignKey("recipients.id"), index=True, nullable=False)
     
     # Event information
     event_type = Column(String(50), nullable=False)  # sent, delivered, opened, clicked, bounced, unsubscribed, complained
-    event_data = Column(JSON, default=dict, nullable=False)
+    event_data = Column(JSONB, default=dict, nullable=False)
     
     # Event details
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
-    location = Column(JSON, default=dict, nullable=False)
+    location = Column(JSONB, default=dict, nullable=False)
+    country = Column(String(2), nullable=True)  # ISO code promoted from location
     
-    # Timestamps
-    event_time = Column(DateTime, default=datetime.utcnow, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Timestamps; event_time is the partition key, so it is part of the primary key
+    event_time = Column(DateTime, server_default=UTC_NOW, primary_key=True)
+    
+    # Range-partitioned by day on event_time
+    __table_args__ = (
+        Index("ix_email_events_campaign_time", campaign_id, event_time),
+        Index("ix_email_events_time_brin", event_time, postgresql_using="brin"),
+        Index("ix_email_events_location_gin", location, postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (event_time)"},
+    )
     
     # Relationships
     campaign = relationship("Campaign")
@@ -137,3 +142,74 @@ class EmailEvent(Base):
     
     def __repr__(self) -> str:
         return f"<EmailEvent(id={self.id}, event_type={self.event_type})>"
+
+
+async def create_email_event_partitions(
+    conn: AsyncConnection, start: date, days: int = 7
+) -> None:
+    """
+    Create daily email_events partitions from ``start``, plus a default catch-all.
+    
+    Each day is created under its own savepoint. A day that can't be
+    attached, e.g. because the default partition already holds rows for
+    it, is logged and skipped without losing the other days.
+    """
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS email_events_default PARTITION OF email_events DEFAULT"
+    ))
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS email_events_{day:%Y%m%d} "
+                    f"PARTITION OF email_events "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+        except DBAPIError as e:
+            logger.error(f"Skipping email_events partition for {day}: {str(e)}")
+
+
+# Rolls each INSERT/COPY batch of email events into the campaign counters
+# with one UPDATE per campaign; the transition table spans all partitions
+EMAIL_EVENT_COUNTER_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION bump_campaign_counters() RETURNS trigger AS $$
+BEGIN
+    UPDATE campaigns AS c
+    SET sent_count = c.sent_count + e.sent,
+        delivered_count = c.delivered_count + e.delivered,
+        opened_count = c.opened_count + e.opened,
+        clicked_count = c.clicked_count + e.clicked,
+        bounced_count = c.bounced_count + e.bounced,
+        unsubscribed_count = c.unsubscribed_count + e.unsubscribed,
+        spam_reports = c.spam_reports + e.complained
+    FROM (
+        SELECT
+            campaign_id,
+            count(*) FILTER (WHERE event_type = 'sent') AS sent,
+            count(*) FILTER (WHERE event_type = 'delivered') AS delivered,
+            count(*) FILTER (WHERE event_type = 'opened') AS opened,
+            count(*) FILTER (WHERE event_type = 'clicked') AS clicked,
+            count(*) FILTER (WHERE event_type = 'bounced') AS bounced,
+            count(*) FILTER (WHERE event_type = 'unsubscribed') AS unsubscribed,
+            count(*) FILTER (WHERE event_type = 'complained') AS complained
+        FROM new_events
+        GROUP BY campaign_id
+    ) AS e
+    WHERE c.id = e.campaign_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+async def create_email_event_counter_trigger(conn: AsyncConnection) -> None:
+    """Install the statement-level trigger that keeps campaign counters current."""
+    await conn.execute(text(EMAIL_EVENT_COUNTER_FUNCTION_SQL))
+    await conn.execute(text("DROP TRIGGER IF EXISTS email_events_bump_counters ON email_events"))
+    await conn.execute(text(
+        "CREATE TRIGGER email_events_bump_counters "
+        "AFTER INSERT ON email_events "
+        "REFERENCING NEW TABLE AS new_events "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_campaign_counters()"
+    ))
@@ -2,16 +2,16 @@
 Campaign model for email campaign management.
 """
 
-from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer, JSON, Enum, ForeignKey, Float
+from typing import Any, Optional, List
+from sqlalchemy import BigInteger, Column, String, DateTime, Boolean, Text, Integer, JSON, Enum, ForeignKey, Index, Select, UniqueConstraint, and_, case, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload
 import enum
-import uuid
 
-from app.core.database import Base
+from app.core.database import Base, UTC_NOW, UUID_SERVER_DEFAULT
 
 class CampaignStatus(str, enum.Enum):
     """Campaign status enumeration"""
@@ -23,6 +23,18 @@ class CampaignStatus(str, enum.Enum):
     CANCELLED = "cancelled"
     ARCHIVED = "archived"
 
+class RecipientStatus(str, enum.Enum):
+    """Campaign recipient delivery status enumeration"""
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DELIVERED = "delivered"
+    OPENED = "opened"
+    CLICKED = "clicked"
+    BOUNCED = "bounced"
+    UNSUBSCRIBED = "unsubscribed"
+    FAILED = "failed"
+
 class CampaignType(str, enum.Enum):
     """Campaign type enumeration"""
     WELCOME = "welcome"
@@ -32,18 +44,55 @@ class CampaignType(str, enum.Enum):
     RE_ENGAGEMENT = "re_engagement"
     CUSTOM = "custom"
 
+def _enum_values(enum_class) -> List[str]:
+    """Label native enums with the members' lowercase values"""
+    return [member.value for member in enum_class]
+
+# Column types built once and shared; string binds aren't re-validated
+_campaign_status_enum = Enum(
+    CampaignStatus, name="campaign_status", native_enum=True,
+    validate_strings=False, values_callable=_enum_values
+)
+_campaign_type_enum = Enum(
+    CampaignType, name="campaign_type", native_enum=True,
+    validate_strings=False, values_callable=_enum_values
+)
+_recipient_status_enum = Enum(
+    RecipientStatus, name="recipient_status", native_enum=True,
+    validate_strings=False, values_callable=_enum_values
+)
+
+# Statuses a campaign can be sent from
+_SENDABLE_STATUSES = (CampaignStatus.DRAFT, CampaignStatus.SCHEDULED)
+
+def _percentage(part: int, whole: int) -> float:
+    """Get part as a percentage of whole, 0 when whole is 0"""
+    return (part / whole) * 100 if whole else 0.0
+
+def _rate(part: str, whole: str, doc: str) -> hybrid_property:
+    """Build a percentage hybrid of two counter columns"""
+    def fget(self) -> float:
+        return _percentage(getattr(self, part), getattr(self, whole))
+    
+    def expression(cls):
+        whole_column = getattr(cls, whole)
+        return case((whole_column == 0, 0.0), else_=getattr(cls, part) * 100.0 / whole_column)
+    
+    fget.__doc__ = doc
+    return hybrid_property(fget, expr=expression)
+
 class Campaign(Base):
     """Campaign model for email campaign management"""
     
     __tablename__ = "campaigns"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
     
     # Foreign keys
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    audience_id = Column(UUID(as_uuid=True), ForeignKey("audiences.id"), nullable=True)
-    template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id"), nullable=True)
+    audience_id = Column(UUID(as_uuid=True), ForeignKey("audiences.id"), index=True, nullable=True)
+    template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id"), index=True, nullable=True)
     
     # Basic campaign info
     name = Column(String(255), nullable=False)
@@ -55,8 +104,8 @@ class Campaign(Base):
     text_content = Column(Text, nullable=True)
     
     # Campaign settings
-    campaign_type = Column(Enum(CampaignType), default=CampaignType.CUSTOM, nullable=False)
-    status = Column(Enum(CampaignStatus), default=CampaignStatus.DRAFT, nullable=False)
+    campaign_type = Column(_campaign_type_enum, default=CampaignType.CUSTOM, nullable=False)
+    status = Column(_campaign_status_enum, default=CampaignStatus.DRAFT, nullable=False)
     
     # Sending settings
     from_name = Column(String(255), nullable=False)
@@ -77,42 +126,70 @@ class Campaign(Base):
         # a_b_test_percentage: int
     # }
     
-    # Analytics
-    recipient_count = Column(Integer, default=0, nullable=False)
-    sent_count = Column(Integer, default=0, nullable=False)
-    delivered_count = Column(Integer, default=0, nullable=False)
-    opened_count = Column(Integer, default=0, nullable=False)
-    clicked_count = Column(Integer, default=0, nullable=False)
-    bounced_count = Column(Integer, default=0, nullable=False)
-    unsubscribed_count = Column(Integer, default=0, nullable=False)
-    spam_reports = Column(Integer, default=0, nullable=False)
-    
-    # Calculated metrics
-    delivery_rate = Column(Float, default=0.0, nullable=False)
-    open_rate = Column(Float, default=0.0, nullable=False)
-    click_rate = Column(Float, default=0.0, nullable=False)
-    bounce_rate = Column(Float, default=0.0, nullable=False)
-    unsubscribe_rate = Column(Float, default=0.0, nullable=False)
+    # Analytics; 64-bit so high-volume senders can't overflow. Maintained
+    # by the email_events_bump_counters trigger, never read-modify-write.
+    recipient_count = Column(BigInteger, default=0, nullable=False)
+    sent_count = Column(BigInteger, default=0, nullable=False)
+    delivered_count = Column(BigInteger, default=0, nullable=False)
+    opened_count = Column(BigInteger, default=0, nullable=False)
+    clicked_count = Column(BigInteger, default=0, nullable=False)
+    bounced_count = Column(BigInteger, default=0, nullable=False)
+    unsubscribed_count = Column(BigInteger, default=0, nullable=False)
+    spam_reports = Column(BigInteger, default=0, nullable=False)
     
     # AI generation info
     ai_generated = Column(Boolean, default=False, nullable=False)
-    ai_generation_id = Column(UUID(as_uuid=True), ForeignKey("ai_generations.id"), nullable=True)
+    ai_generation_id = Column(UUID(as_uuid=True), ForeignKey("ai_generations.id"), index=True, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
-    # Relationships
-    user = relationship("User", back_populates="campaigns")
-    audience = relationship("Audience", back_populates="campaigns")
-    template = relationship("Template", back_populates="campaigns")
+    # Covering indexes for the campaign list (filter by user + status/type, newest first)
+    __table_args__ = (
+        Index(
+            "ix_campaigns_user_status_created",
+            user_id, status, created_at.desc(), id.desc(),
+            postgresql_include=["subject", "campaign_type"],
+        ),
+        Index(
+            "ix_campaigns_user_type_created",
+            user_id, campaign_type, created_at.desc(), id.desc(),
+            postgresql_include=["subject", "status"],
+        ),
+        # Only sendable campaigns, in schedule order, for the sender's poll
+        Index(
+            "ix_campaigns_sendable",
+            scheduled_at,
+            postgresql_where=and_(
+                status.in_(_SENDABLE_STATUSES),
+                recipient_count > 0,
+                html_content.isnot(None)
+            ),
+        ),
+    )
+    
+    # Relationships; related rows must be loaded explicitly (see with_related)
+    user = relationship("User", back_populates="campaigns", lazy="raise")
+    audience = relationship("Audience", back_populates="campaigns", lazy="raise")
+    template = relationship("Template", back_populates="campaigns", lazy="raise")
     ai_generation = relationship("AIGeneration", back_populates="campaigns")
-    email_sends = relationship("EmailSend", back_populates="campaign", cascade="all, delete-orphan")
-    email_events = relationship("EmailEvent", back_populates="campaign", cascade="all, delete-orphan")
+    # Children are removed by ON DELETE CASCADE, not loaded and deleted by the ORM
+    email_sends = relationship("EmailSend", back_populates="campaign", cascade="all, delete-orphan", passive_deletes=True)
+    email_events = relationship("EmailEvent", back_populates="campaign", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Campaign(id={self.id}, name='{self.name}', status='{self.status}')>"
     
+    @classmethod
+    def with_related(cls) -> Select:
+        """Select campaigns with their user, audience and template batch-loaded"""
+        return select(cls).options(
+            selectinload(cls.user),
+            selectinload(cls.audience),
+            selectinload(cls.template)
+        )
+    
     @property
     def is_sent(self) -> bool:
         """Check if campaign has been sent"""
@@ -128,49 +205,54 @@ class Campaign(Base):
         """Check if campaign is in draft status"""
         return self.status == CampaignStatus.DRAFT
     
-    @property
+    @hybrid_property
     def can_be_sent(self) -> bool:
         """Check if campaign can be sent"""
         return (
-            self.status in [CampaignStatus.DRAFT, CampaignStatus.SCHEDULED] and
+            self.status in _SENDABLE_STATUSES and
             self.recipient_count > 0 and
             self.html_content is not None
         )
     
-    @property
-    def progress_percentage(self) -> float:
-        """Get campaign sending progress percentage"""
-        if self.recipient_count == 0:
-            return 0.0
-        return (self.sent_count / self.recipient_count) * 100
-    
-    def update_analytics(self):
-        """Update calculated analytics metrics"""
-        if self.recipient_count > 0:
-            self.delivery_rate = (self.delivered_count / self.recipient_count) * 100
-            self.open_rate = (self.opened_count / self.delivered_count) * 100 if self.delivered_count > 0 else 0
-            self.click_rate = (self.clicked_count / self.opened_count) * 100 if self.opened_count > 0 else 0
-            self.bounce_rate = (self.bounced_count / self.recipient_count) * 100
-            self.unsubscribe_rate = (self.unsubscribed_count / self.recipient_count) * 100
+    @can_be_sent.expression
+    def can_be_sent(cls):
+        # Matches ix_campaigns_sendable's predicate so polls use that index
+        return and_(
+            cls.status.in_(_SENDABLE_STATUSES),
+            cls.recipient_count > 0,
+            cls.html_content.isnot(None)
+        )
+    
+    # Rates are derived from the counters rather than stored, so event
+    # updates only touch counters. Each is a hybrid: a Python division on
+    # instances and a SQL expression on the class, so list queries can
+    # select them instead of computing per row in Python.
+    progress_percentage = _rate("sent_count", "recipient_count", "Get campaign sending progress percentage")
+    delivery_rate = _rate("delivered_count", "recipient_count", "Get delivered percentage of recipients")
+    open_rate = _rate("opened_count", "delivered_count", "Get opened percentage of delivered emails")
+    click_rate = _rate("clicked_count", "opened_count", "Get clicked percentage of opened emails")
+    bounce_rate = _rate("bounced_count", "recipient_count", "Get bounced percentage of recipients")
+    unsubscribe_rate = _rate("unsubscribed_count", "recipient_count", "Get unsubscribed percentage of recipients")
+    
+    # Fields of the analytics summary, shared by the Python and SQL forms
+    _SUMMARY_FIELDS = (
+        "recipient_count", "sent_count", "delivered_count", "opened_count",
+        "clicked_count", "bounced_count", "unsubscribed_count", "spam_reports",
+        "delivery_rate", "open_rate", "click_rate", "bounce_rate",
+        "unsubscribe_rate", "progress_percentage",
+    )
     
     def get_analytics_summary(self) -> dict:
         """Get campaign analytics summary"""
-        return {
-            "recipient_count": self.recipient_count,
-            "sent_count": self.sent_count,
-            "delivered_count": self.delivered_count,
-            "opened_count": self.opened_count,
-            "clicked_count": self.clicked_count,
-            "bounced_count": self.bounced_count,
-            "unsubscribed_count": self.unsubscribed_count,
-            "spam_reports": self.spam_reports,
-            "delivery_rate": self.delivery_rate,
-            "open_rate": self.open_rate,
-            "click_rate": self.click_rate,
-            "bounce_rate": self.bounce_rate,
-            "unsubscribe_rate": self.unsubscribe_rate,
-            "progress_percentage": self.progress_percentage
-        }
+        return {field: getattr(self, field) for field in self._SUMMARY_FIELDS}
+    
+    @classmethod
+    def analytics_summary_json(cls):
+        """Get a SQL expression building the analytics summary as JSONB in Postgres"""
+        arguments = []
+        for field in cls._SUMMARY_FIELDS:
+            arguments += [literal(field), getattr(cls, field)]
+        return func.jsonb_build_object(*arguments).label("analytics_json")
 
 
 class CampaignRecipient(Base):
@@ -178,12 +260,14 @@ class CampaignRecipient(Base):
     
     __tablename__ = "campaign_recipients"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
-    recipient_id = Column(UUID(as_uuid=True), ForeignKey("recipients.id"), nullable=False)
+    # campaign_id is the partition key, so it is part of the primary key
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    recipient_id = Column(UUID(as_uuid=True), ForeignKey("recipients.id"), index=True, nullable=False)
     
     # Delivery status
-    status = Column(String(20), default="pending", nullable=False)  # pending, sent, delivered, opened, clicked, bounced, unsubscribed
+    # Native 4-byte enum labelled with the lowercase values
+    status = Column(_recipient_status_enum, default=RecipientStatus.PENDING, nullable=False)
     sent_at = Column(DateTime, nullable=True)
     delivered_at = Column(DateTime, nullable=True)
     opened_at = Column(DateTime, nullable=True)
@@ -198,8 +282,31 @@ class CampaignRecipient(Base):
     last_clicked_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
+    
+    # Recipient lookups within a campaign and per-status counts; the unique
+    # constraint's index also covers campaign_id on its own
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "recipient_id", name="uq_campaign_recipients_campaign_recipient"),
+        Index("ix_campaign_recipients_campaign_status", "campaign_id", "status"),
+        # The unsent queue; covers the sender's pending ID scan index-only
+        Index(
+            "ix_campaign_recipients_pending",
+            "campaign_id",
+            postgresql_include=["id"],
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Append-only created_at; BRIN keeps time-range scans off cold pages
+        Index(
+            "ix_campaign_recipients_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        # Hash-partitioned on campaign_id so each partition's indexes stay cacheable
+        {"postgresql_partition_by": "HASH (campaign_id)"},
+    )
     
     # Relationships
     campaign = relationship("Campaign", back_populates="recipients")
@@ -207,3 +314,128 @@ class CampaignRecipient(Base):
     
     def __repr__(self) -> str:
         return f"<CampaignRecipient(campaign_id={self.campaign_id}, recipient_id={self.recipient_id})>"
+
+
+async def transition_campaign(
+    session: AsyncSession,
+    campaign_id: Any,
+    user_id: Any,
+    allowed_statuses: List[str],
+    values: dict,
+    *conditions: Any
+) -> Optional[Any]:
+    """
+    Apply a campaign status transition in a single UPDATE ... RETURNING.
+    
+    Ownership, the allowed previous statuses and any extra conditions are
+    checked in the same statement. Returns None when no row was updated.
+    """
+    result = await session.execute(
+        update(Campaign)
+        .where(
+            Campaign.id == campaign_id,
+            Campaign.user_id == user_id,
+            Campaign.status.in_(allowed_statuses),
+            *conditions
+        )
+        .values(**values)
+        .returning(Campaign.id, Campaign.status)
+    )
+    return result.first()
+
+
+# Tables referencing campaigns and the ON DELETE action of that foreign key
+CAMPAIGN_CHILD_FOREIGN_KEYS = {
+    "campaign_recipients": "CASCADE",
+    "campaign_analytics": "CASCADE",
+    "email_events": "CASCADE",
+    "copy_corpus": "SET NULL",
+}
+
+# pg_constraint.confdeltype codes for the actions above
+_DELETE_ACTION_CODES = {"CASCADE": "c", "SET NULL": "n"}
+
+
+async def apply_campaign_foreign_key_actions(conn: AsyncConnection) -> None:
+    """
+    Re-create campaign foreign keys created before their ON DELETE action was declared.
+    
+    create_all never alters an existing constraint, so older databases
+    keep NO ACTION and campaign deletes fail; constraints that already
+    have the right action are left alone.
+    """
+    for table, action in CAMPAIGN_CHILD_FOREIGN_KEYS.items():
+        constraint = f"{table}_campaign_id_fkey"
+        await conn.execute(text(f"""
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = '{constraint}' AND confdeltype <> '{_DELETE_ACTION_CODES[action]}'
+    ) THEN
+        ALTER TABLE {table} DROP CONSTRAINT {constraint};
+        ALTER TABLE {table} ADD CONSTRAINT {constraint}
+            FOREIGN KEY (campaign_id) REFERENCES campaigns (id) ON DELETE {action};
+    END IF;
+END $$
+"""))
+
+
+async def add_recipient_status_values(conn: AsyncConnection) -> None:
+    """Add RecipientStatus members missing from an existing recipient_status type."""
+    for member in RecipientStatus:
+        await conn.execute(text(
+            f"ALTER TYPE recipient_status ADD VALUE IF NOT EXISTS '{member.value}'"
+        ))
+
+
+# Hash partitions of campaign_recipients
+CAMPAIGN_RECIPIENT_PARTITIONS = 16
+
+
+async def create_campaign_recipient_partitions(conn: AsyncConnection) -> None:
+    """Create the hash partitions of campaign_recipients."""
+    for remainder in range(CAMPAIGN_RECIPIENT_PARTITIONS):
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS campaign_recipients_p{remainder} "
+            f"PARTITION OF campaign_recipients "
+            f"FOR VALUES WITH (MODULUS {CAMPAIGN_RECIPIENT_PARTITIONS}, REMAINDER {remainder})"
+        ))
+
+
+# Per-campaign counters and rates for analytics dashboards, refreshed
+# periodically by the refresh_campaign_analytics task
+CAMPAIGN_ANALYTICS_VIEW_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS campaign_analytics_mv AS
+SELECT
+    id,
+    user_id,
+    recipient_count,
+    sent_count,
+    delivered_count,
+    opened_count,
+    clicked_count,
+    bounced_count,
+    unsubscribed_count,
+    spam_reports,
+    COALESCE(delivered_count * 100.0 / NULLIF(recipient_count, 0), 0) AS delivery_rate,
+    COALESCE(opened_count * 100.0 / NULLIF(delivered_count, 0), 0) AS open_rate,
+    COALESCE(clicked_count * 100.0 / NULLIF(opened_count, 0), 0) AS click_rate,
+    COALESCE(bounced_count * 100.0 / NULLIF(recipient_count, 0), 0) AS bounce_rate,
+    COALESCE(unsubscribed_count * 100.0 / NULLIF(recipient_count, 0), 0) AS unsubscribe_rate
+FROM campaigns
+"""
+
+
+async def create_campaign_analytics_view(conn: AsyncConnection) -> None:
+    """Create campaign_analytics_mv with the unique index REFRESH ... CONCURRENTLY needs."""
+    await conn.execute(text(CAMPAIGN_ANALYTICS_VIEW_SQL))
+    await conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_campaign_analytics_mv_id "
+        "ON campaign_analytics_mv (id)"
+    ))
+
+
+async def refresh_campaign_analytics_view(conn: AsyncConnection) -> None:
+    """Refresh campaign_analytics_mv without blocking readers."""
+    await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY campaign_analytics_mv"))
@@ -2,16 +2,14 @@
 Copy Corpus model for brand voice examples and embeddings.
 """
 
-from datetime import datetime
-from typing import Optional
+from pgvector.sqlalchemy import Vector
 from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID, VECTOR
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
-import uuid
 
-from app.core.database import Base
+from app.core.database import Base, UUID_SERVER_DEFAULT
 
 class CopyType(str, enum.Enum):
     """Copy type enumeration"""
@@ -21,28 +19,35 @@ class CopyType(str, enum.Enum):
     BRAND_VOICE = "brand_voice"
     WINNING_COPY = "winning_copy"
 
+# Built once; labelled with the members' values like the campaign enums
+_copy_type_enum = Enum(
+    CopyType, name="copy_type", native_enum=True, validate_strings=False,
+    values_callable=lambda copy_types: [member.value for member in copy_types]
+)
+
 class CopyCorpus(Base):
     """Copy Corpus model for brand voice examples and embeddings"""
     
     __tablename__ = "copy_corpus"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
     
     # Foreign keys
-    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # Copy information
     label = Column(String(255), nullable=False)  # e.g., "High-performing subject line"
     content = Column(Text, nullable=False)  # The actual copy text
-    copy_type = Column(Enum(CopyType), nullable=False)
+    copy_type = Column(_copy_type_enum, nullable=False)
     
     # Performance metrics (if applicable)
     performance_score = Column(String(50), nullable=True)  # e.g., "open_rate: 25%"
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=True)
+    # Examples outlive the campaign they came from
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="SET NULL"), index=True, nullable=True)
     
     # Vector embedding for similarity search
-    embedding = Column(VECTOR(1536), nullable=True)  # OpenAI embedding dimension
+    embedding = Column(Vector(1536), nullable=True)  # OpenAI embedding dimension
     
     # Metadata
     tags = Column(String(500), nullable=True)  # Comma-separated tags
@@ -2,13 +2,36 @@
 Notification model for user notifications and alerts.
 """
 
+import re
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer
+from functools import lru_cache
+from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from app.core.database import Base
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from app.core.database import Base, UTC_NOW, UUID_SERVER_DEFAULT
+
+
+# {name} placeholders in notification templates; names must be identifiers,
+# since {0} or {} would become positional fields that format_map can't fill
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+
+class _KeepMissing(dict):
+    """Format mapping that leaves placeholders without a value untouched."""
+    
+    def __missing__(self, key: str) -> str:
+        return f"{{{key}}}"
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(template: str) -> str:
+    """Convert a notification template into a ``str.format_map`` format string."""
+    parts = _PLACEHOLDER.split(template)
+    # Odd parts are placeholder names; braces in the literal text are escaped
+    return "".join(
+        f"{{{part}}}" if index % 2 else part.replace("{", "{{").replace("}", "}}")
+        for index, part in enumerate(parts)
+    )
 
 
 class Notification(Base):
@@ -16,7 +39,7 @@ class Notification(Base):
     
     __tablename__ = "notifications"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Notification information
@@ -33,7 +56,8 @@ class Notification(Base):
     # Action and metadata
     action_url = Column(String(500), nullable=True)
     action_text = Column(String(100), nullable=True)
-    metadata = Column(JSON, default=dict, nullable=False)
+    # "metadata" is reserved on declarative classes, so the attribute is meta
+    meta = Column("metadata", JSONB, server_default=text("'{}'::jsonb"), nullable=False)
     
     # Delivery settings
     email_sent = Column(Boolean, default=False, nullable=False)
@@ -42,13 +66,31 @@ class Notification(Base):
     push_sent_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     read_at = Column(DateTime, nullable=True)
     expires_at = Column(DateTime, nullable=True)
     
+    # Unread notifications per user; metadata containment (@>) lookups;
+    # BRIN for time-range scans over the append-only created_at
+    __table_args__ = (
+        Index("ix_notifications_user_unread", "user_id", "is_read"),
+        Index(
+            "ix_notifications_metadata_gin",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_notifications_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+    )
+    
     # Relationships
-    user = relationship("User", back_populates="notifications")
+    user = relationship("User", back_populates="notifications", lazy="raise")
     
     def __repr__(self) -> str:
         return f"<Notification(id={self.id}, type={self.notification_type}, title={self.title})>"
@@ -80,7 +122,7 @@ class NotificationTemplate(Base):
     
     __tablename__ = "notification_templates"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
     
     # Template information
     name = Column(String(255), nullable=False)
@@ -105,20 +147,18 @@ class NotificationTemplate(Base):
     tags = Column(JSON, default=list, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     
     def __repr__(self) -> str:
         return f"<NotificationTemplate(id={self.id}, name={self.name})>"
     
     def render(self, **kwargs) -> dict:
         """Render template with provided variables."""
-        title = self.title_template
-        message = self.message_template
-        
-        for key, value in kwargs.items():
-            title = title.replace(f"{{{key}}}", str(value))
-            message = message.replace(f"{{{key}}}", str(value))
+        # Compiled once per distinct template text, then filled in a single pass
+        values = _KeepMissing(kwargs)
+        title = _compile_template(self.title_template).format_map(values)
+        message = _compile_template(self.message_template).format_map(values)
         
         return {
             "title": title,
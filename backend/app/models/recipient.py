@@ -2,13 +2,10 @@
 Recipient model for managing email recipients and lists.
 """
 
-from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer
+from sqlalchemy import Column, Computed, String, Text, DateTime, Boolean, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from app.core.database import Base
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from app.core.database import Base, UTC_NOW, UUID_SERVER_DEFAULT
 
 
 class Recipient(Base):
@@ -16,7 +13,7 @@ class Recipient(Base):
     
     __tablename__ = "recipients"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Contact information
@@ -27,6 +24,13 @@ class Recipient(Base):
     job_title = Column(String(100), nullable=True)
     phone = Column(String(20), nullable=True)
     
+    # "first last", or whichever part is set; computed by Postgres on write
+    # and trigram-indexed for ILIKE name search
+    full_name = Column(
+        Text,
+        Computed("btrim(coalesce(first_name, '') || ' ' || coalesce(last_name, ''))", persisted=True)
+    )
+    
     # Status and preferences
     is_active = Column(Boolean, default=True, nullable=False)
     is_subscribed = Column(Boolean, default=True, nullable=False)
@@ -38,14 +42,27 @@ class Recipient(Base):
     unsubscription_date = Column(DateTime, nullable=True)
     
     # Custom fields
-    custom_fields = Column(JSON, default=dict, nullable=False)
+    custom_fields = Column(JSONB, default=dict, nullable=False)
     
-    # Tags and lists
-    tags = Column(JSON, default=list, nullable=False)
+    # Tags and lists; a native text[] for segmentation by tag
+    tags = Column(ARRAY(Text), server_default="{}", nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
+    
+    # One recipient per email address per user; also serves user_id lookups.
+    # Tag filters use array containment (@>), which the GIN index answers.
+    __table_args__ = (
+        Index("ix_recipients_user_email", "user_id", "email", unique=True),
+        Index("ix_recipients_tags_gin", "tags", postgresql_using="gin"),
+        Index(
+            "ix_recipients_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
     
     # Relationships
     user = relationship("User", back_populates="recipients")
@@ -54,16 +71,10 @@ class Recipient(Base):
     def __repr__(self) -> str:
         return f"<Recipient(id={self.id}, email={self.email})>"
     
-    @property
-    def full_name(self) -> str:
-        """Get recipient's full name."""
-        if self.first_name and self.last_name:
-            return f"{self.first_name} {self.last_name}"
-        elif self.first_name:
-            return self.first_name
-        elif self.last_name:
-            return self.last_name
-        return ""
+    @classmethod
+    def has_tag(cls, tag: str):
+        """Get a filter for recipients carrying a tag, served by the tags GIN index."""
+        return cls.tags.contains([tag])
 
 
 class RecipientList(Base):
@@ -71,8 +82,8 @@ class RecipientList(Base):
     
     __tablename__ = "recipient_lists"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # List information
     name = Column(String(255), nullable=False)
@@ -82,21 +93,21 @@ class RecipientList(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     is_public = Column(Boolean, default=False, nullable=False)
     
-    # List metadata
-    tags = Column(JSON, default=list, nullable=False)
-    metadata = Column(JSON, default=dict, nullable=False)
+    # List metadata; "metadata" is reserved on declarative classes
+    tags = Column(JSONB, default=list, nullable=False)
+    meta = Column("metadata", JSONB, default=dict, nullable=False)
     
     # Statistics
     total_recipients = Column(Integer, default=0, nullable=False)
     active_recipients = Column(Integer, default=0, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     
     # Relationships
     user = relationship("User")
-    recipients = relationship("RecipientListMember", back_populates="list", cascade="all, delete-orphan")
+    recipients = relationship("RecipientListMember", back_populates="list", cascade="all, delete-orphan", lazy="raise")
     
     def __repr__(self) -> str:
         return f"<RecipientList(id={self.id}, name={self.name})>"
@@ -107,18 +118,18 @@ class RecipientListMember(Base):
     
     __tablename__ = "recipient_list_members"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    list_id = Column(UUID(as_uuid=True), ForeignKey("recipient_lists.id"), nullable=False)
-    recipient_id = Column(UUID(as_uuid=True), ForeignKey("recipients.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    list_id = Column(UUID(as_uuid=True), ForeignKey("recipient_lists.id"), index=True, nullable=False)
+    recipient_id = Column(UUID(as_uuid=True), ForeignKey("recipients.id"), index=True, nullable=False)
     
     # Membership status
     is_active = Column(Boolean, default=True, nullable=False)
-    joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    joined_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
     left_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     
     # Relationships
     list = relationship("RecipientList", back_populates="recipients")
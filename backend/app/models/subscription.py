@@ -3,12 +3,19 @@ Subscription model for user subscription and billing management.
 """
 
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer, Float
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from app.core.database import Base
+from app.core.database import Base, UTC_NOW, UUID_SERVER_DEFAULT
+
+# Usage type -> (usage column, limit column), resolved once instead of
+# building lookup dicts on every quota check
+USAGE_FIELDS = {
+    "emails": ("emails_sent_this_period", "email_limit"),
+    "recipients": ("recipients_this_period", "recipient_limit"),
+    "campaigns": ("campaigns_this_period", "campaign_limit"),
+    "ai_requests": ("ai_requests_this_period", "ai_request_limit"),
+}
 
 
 class Subscription(Base):
@@ -16,8 +23,8 @@ class Subscription(Base):
     
     __tablename__ = "subscriptions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # Subscription information
     plan_name = Column(String(100), nullable=False)  # free, pro, enterprise
@@ -49,13 +56,13 @@ class Subscription(Base):
     ai_requests_this_period = Column(Integer, default=0, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     cancelled_at = Column(DateTime, nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="subscriptions")
-    invoices = relationship("Invoice", back_populates="subscription", cascade="all, delete-orphan")
+    invoices = relationship("Invoice", back_populates="subscription", cascade="all, delete-orphan", lazy="raise")
     
     def __repr__(self) -> str:
         return f"<Subscription(id={self.id}, plan={self.plan_name}, status={self.status})>"
@@ -72,27 +79,16 @@ class Subscription(Base):
     
     def get_usage_percentage(self, usage_type: str) -> float:
         """Get usage percentage for a specific type."""
-        limits = {
-            "emails": self.email_limit,
-            "recipients": self.recipient_limit,
-            "campaigns": self.campaign_limit,
-            "ai_requests": self.ai_request_limit,
-        }
-        
-        usage = {
-            "emails": self.emails_sent_this_period,
-            "recipients": self.recipients_this_period,
-            "campaigns": self.campaigns_this_period,
-            "ai_requests": self.ai_requests_this_period,
-        }
-        
-        limit = limits.get(usage_type, 0)
-        current_usage = usage.get(usage_type, 0)
+        fields = USAGE_FIELDS.get(usage_type)
+        if fields is None:
+            return 0.0
         
+        usage_field, limit_field = fields
+        limit = getattr(self, limit_field)
         if limit == 0:
             return 0.0
         
-        return (current_usage / limit) * 100
+        return (getattr(self, usage_field) / limit) * 100
 
 
 class Invoice(Base):
@@ -100,9 +96,9 @@ class Invoice(Base):
     
     __tablename__ = "invoices"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    subscription_id = Column(UUID(as_uuid=True), ForeignKey("subscriptions.id"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    subscription_id = Column(UUID(as_uuid=True), ForeignKey("subscriptions.id"), index=True, nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # Invoice information
     stripe_invoice_id = Column(String(255), nullable=True)
@@ -123,11 +119,21 @@ class Invoice(Base):
     payment_status = Column(String(50), nullable=False)  # pending, paid, failed, cancelled
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     due_date = Column(DateTime, nullable=True)
     paid_at = Column(DateTime, nullable=True)
     
+    # Append-only created_at; BRIN keeps time-range scans off cold pages
+    __table_args__ = (
+        Index(
+            "ix_invoices_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+    )
+    
     # Relationships
     subscription = relationship("Subscription", back_populates="invoices")
     user = relationship("User")
@@ -2,13 +2,11 @@
 Template model for email template management.
 """
 
-from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from app.core.database import Base
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from app.core.database import Base, UTC_NOW, UUID_SERVER_DEFAULT
 
 
 class Template(Base):
@@ -16,8 +14,8 @@ class Template(Base):
     
     __tablename__ = "templates"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # Template information
     name = Column(String(255), nullable=False)
@@ -35,21 +33,31 @@ class Template(Base):
     # Template variables
     variables = Column(JSON, default=list, nullable=False)  # List of variable names
     
-    # Template metadata
-    tags = Column(JSON, default=list, nullable=False)
-    metadata = Column(JSON, default=dict, nullable=False)
+    # Template metadata; "metadata" is reserved on declarative classes
+    tags = Column(JSONB, default=list, nullable=False)
+    meta = Column("metadata", JSONB, default=dict, nullable=False)
     
     # Usage statistics
     usage_count = Column(Integer, default=0, nullable=False)
     last_used_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
+    
+    # Tag filters use containment (@>), which the GIN index answers
+    __table_args__ = (
+        Index(
+            "ix_templates_tags_gin",
+            "tags",
+            postgresql_using="gin",
+            postgresql_ops={"tags": "jsonb_path_ops"},
+        ),
+    )
     
     # Relationships
     user = relationship("User", back_populates="templates")
-    campaigns = relationship("Campaign", backref="template")
+    campaigns = relationship("Campaign", backref="template", lazy="raise")
     
     def __repr__(self) -> str:
         return f"<Template(id={self.id}, name={self.name})>"
@@ -68,8 +76,8 @@ class TemplateVariable(Base):
     
     __tablename__ = "template_variables"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
+    template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id"), index=True, nullable=False)
     
     # Variable information
     name = Column(String(100), nullable=False)
@@ -82,8 +90,8 @@ class TemplateVariable(Base):
     validation_rules = Column(JSON, default=dict, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
     
     # Relationships
     template = relationship("Template")
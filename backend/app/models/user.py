@@ -4,14 +4,15 @@ User model for authentication and user management.
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, JSON, Enum
+from sqlalchemy import CheckConstraint, Column, String, Boolean, DateTime, Text, Integer, JSON, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
 from sqlalchemy.sql import func
 import enum
+import uuid
 
-from app.core.database import Base
+from app.core.database import Base, UUID_SERVER_DEFAULT
 
 class UserRole(str, enum.Enum):
     """User roles enumeration"""
@@ -26,13 +27,42 @@ class SubscriptionPlan(str, enum.Enum):
     PREMIUM = "premium"
     ENTERPRISE = "enterprise"
 
+def _one_of(column: str, values: type) -> str:
+    """SQL for a CHECK that keeps a string column to an enum's values."""
+    return f"{column} IN ({', '.join(repr(member.value) for member in values)})"
+
+# Plans that unlock the premium-only features
+_PREMIUM_PLANS = frozenset({SubscriptionPlan.PREMIUM.value, SubscriptionPlan.ENTERPRISE.value})
+
+# Per-plan usage limits, looked up on every permission check
+_CAMPAIGN_LIMITS = {
+    SubscriptionPlan.FREE.value: 5,
+    SubscriptionPlan.BASIC.value: 25,
+    SubscriptionPlan.PREMIUM.value: 100,
+    SubscriptionPlan.ENTERPRISE.value: 1000
+}
+
+_EMAIL_LIMITS = {
+    SubscriptionPlan.FREE.value: 1000,
+    SubscriptionPlan.BASIC.value: 10000,
+    SubscriptionPlan.PREMIUM.value: 50000,
+    SubscriptionPlan.ENTERPRISE.value: 1000000
+}
+
+_AI_GENERATION_LIMITS = {
+    SubscriptionPlan.FREE.value: 50,
+    SubscriptionPlan.BASIC.value: 200,
+    SubscriptionPlan.PREMIUM.value: 1000,
+    SubscriptionPlan.ENTERPRISE.value: 10000
+}
+
 class User(Base):
     """User model for authentication and profile management"""
     
     __tablename__ = "users"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=UUID_SERVER_DEFAULT)
     
     # Authentication fields
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -57,8 +87,9 @@ class User(Base):
     preferences = Column(JSON, nullable=True)  # {theme, timezone, notifications}
     
     # Role and subscription
-    role = Column(Enum(UserRole), default=UserRole.USER, nullable=False)
-    subscription_plan = Column(Enum(SubscriptionPlan), default=SubscriptionPlan.FREE, nullable=False)
+    # Plain strings loaded as-is; the CHECK constraints keep them to the enum values
+    role = Column(String(16), default=UserRole.USER.value, nullable=False)
+    subscription_plan = Column(String(16), default=SubscriptionPlan.FREE.value, nullable=False)
     subscription_expires_at = Column(DateTime(timezone=True), nullable=True)
     
     # Stripe customer ID for payments
@@ -74,11 +105,16 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     last_login_at = Column(DateTime(timezone=True), nullable=True)
     
-    # Relationships
-    campaigns = relationship("Campaign", back_populates="user", cascade="all, delete-orphan")
-    audiences = relationship("Audience", back_populates="user", cascade="all, delete-orphan")
-    templates = relationship("Template", back_populates="user", cascade="all, delete-orphan")
-    ai_generations = relationship("AIGeneration", back_populates="user", cascade="all, delete-orphan")
+    __table_args__ = (
+        CheckConstraint(_one_of("role", UserRole), name="ck_users_role"),
+        CheckConstraint(_one_of("subscription_plan", SubscriptionPlan), name="ck_users_subscription_plan"),
+    )
+    
+    # Relationships; collections must be loaded explicitly with selectinload()
+    campaigns = relationship("Campaign", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    audiences = relationship("Audience", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    templates = relationship("Template", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    ai_generations = relationship("AIGeneration", back_populates="user", cascade="all, delete-orphan", lazy="raise")
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', role='{self.role}')>"
@@ -96,23 +132,20 @@ class User(Base):
     @property
     def is_premium(self) -> bool:
         """Check if user has premium subscription"""
-        return self.subscription_plan in [SubscriptionPlan.PREMIUM, SubscriptionPlan.ENTERPRISE]
+        return self.subscription_plan in _PREMIUM_PLANS
     
-    @property
     def can_create_campaign(self) -> bool:
         """Check if user can create a new campaign"""
         if self.role == UserRole.ADMIN:
             return True
         return self.campaigns_created < self.get_campaign_limit()
     
-    @property
     def can_send_emails(self) -> bool:
         """Check if user can send emails"""
         if self.role == UserRole.ADMIN:
             return True
         return self.emails_sent_this_month < self.get_email_limit()
     
-    @property
     def can_generate_ai_content(self) -> bool:
         """Check if user can generate AI content"""
         if self.role == UserRole.ADMIN:
@@ -121,47 +154,55 @@ class User(Base):
     
     def get_campaign_limit(self) -> int:
         """Get campaign limit based on subscription"""
-        limits = {
-            SubscriptionPlan.FREE: 5,
-            SubscriptionPlan.BASIC: 25,
-            SubscriptionPlan.PREMIUM: 100,
-            SubscriptionPlan.ENTERPRISE: 1000
-        }
-        return limits.get(self.subscription_plan, 5)
+        return _CAMPAIGN_LIMITS.get(self.subscription_plan, 5)
     
     def get_email_limit(self) -> int:
         """Get email limit based on subscription"""
-        limits = {
-            SubscriptionPlan.FREE: 1000,
-            SubscriptionPlan.BASIC: 10000,
-            SubscriptionPlan.PREMIUM: 50000,
-            SubscriptionPlan.ENTERPRISE: 1000000
-        }
-        return limits.get(self.subscription_plan, 1000)
+        return _EMAIL_LIMITS.get(self.subscription_plan, 1000)
     
     def get_ai_generation_limit(self) -> int:
         """Get AI generation limit based on subscription"""
-        limits = {
-            SubscriptionPlan.FREE: 50,
-            SubscriptionPlan.BASIC: 200,
-            SubscriptionPlan.PREMIUM: 1000,
-            SubscriptionPlan.ENTERPRISE: 10000
-        }
-        return limits.get(self.subscription_plan, 50)
+        return _AI_GENERATION_LIMITS.get(self.subscription_plan, 50)
     
     def has_permission(self, permission: str) -> bool:
         """Check if user has specific permission"""
         if self.role == UserRole.ADMIN:
             return True
         
-        permissions = {
-            "create_campaign": self.can_create_campaign,
-            "send_emails": self.can_send_emails,
-            "generate_ai": self.can_generate_ai_content,
-            "advanced_analytics": self.is_premium,
-            "team_collaboration": self.is_premium,
-            "api_access": self.is_premium,
-            "white_label": self.subscription_plan == SubscriptionPlan.ENTERPRISE
-        }
+        # Usage-gated permissions depend on this month's counters
+        usage_check = _USAGE_PERMISSIONS.get(permission)
+        if usage_check is not None:
+            return usage_check(self)
         
-        return permissions.get(permission, False)
+        return permission in _PLAN_PERMISSIONS.get(self.subscription_plan, frozenset())
+
+
+# Permission name -> usage check, evaluated only for the permission asked for
+_USAGE_PERMISSIONS = {
+    "create_campaign": User.can_create_campaign,
+    "send_emails": User.can_send_emails,
+    "generate_ai": User.can_generate_ai_content,
+}
+
+# Permissions granted by the subscription plan alone
+_PREMIUM_PERMISSIONS = frozenset({"advanced_analytics", "team_collaboration", "api_access"})
+_PLAN_PERMISSIONS = {
+    SubscriptionPlan.FREE.value: frozenset(),
+    SubscriptionPlan.BASIC.value: frozenset(),
+    SubscriptionPlan.PREMIUM.value: _PREMIUM_PERMISSIONS,
+    SubscriptionPlan.ENTERPRISE.value: _PREMIUM_PERMISSIONS | {"white_label"},
+}
+
+
+async def increment_user_usage(
+    session: AsyncSession, user_id: uuid.UUID, **increments: int
+) -> None:
+    """Add to a user's usage counters atomically in one UPDATE, without loading the row."""
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values({
+            name: getattr(User, name) + amount
+            for name, amount in increments.items()
+        })
+    )
@@ -4,11 +4,6 @@ Pydantic schemas for request/response validation.
 
 from .user import *
 from .campaign import *
-from .recipient import *
-from .template import *
-from .analytics import *
-from .subscription import *
-from .notification import *
 from .auth import *
 from .common import *
 
@@ -26,36 +21,6 @@ __all__ = [
     "CampaignList",
     "CampaignStats",
     
-    # Recipient schemas
-    "RecipientCreate",
-    "RecipientUpdate",
-    "RecipientResponse",
-    "RecipientList",
-    "RecipientListCreate",
-    "RecipientListUpdate",
-    "RecipientListResponse",
-    
-    # Template schemas
-    "TemplateCreate",
-    "TemplateUpdate",
-    "TemplateResponse",
-    "TemplateList",
-    
-    # Analytics schemas
-    "CampaignAnalyticsResponse",
-    "UserAnalyticsResponse",
-    "EmailEventResponse",
-    
-    # Subscription schemas
-    "SubscriptionCreate",
-    "SubscriptionResponse",
-    "InvoiceResponse",
-    
-    # Notification schemas
-    "NotificationCreate",
-    "NotificationResponse",
-    "NotificationList",
-    
     # Auth schemas
     "LoginRequest",
     "RegisterRequest",
@@ -2,20 +2,20 @@
 AI schemas for content generation and analysis.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime
 
 
 class AIGenerationRequest(BaseModel):
     """AI content generation request schema."""
-    content_type: str = Field(..., regex="^(subject|content|both|template)$", description="Type of content to generate")
-    campaign_type: str = Field(..., regex="^(newsletter|promotional|transactional|automated)$", description="Campaign type")
+    content_type: Literal["subject", "content", "both", "template"] = Field(..., description="Type of content to generate")
+    campaign_type: Literal["newsletter", "promotional", "transactional", "automated"] = Field(..., description="Campaign type")
     
     # Content parameters
     topic: Optional[str] = Field(None, description="Main topic or theme")
-    tone: Optional[str] = Field(None, regex="^(professional|casual|friendly|formal|enthusiastic|urgent)$", description="Content tone")
-    length: Optional[str] = Field(None, regex="^(short|medium|long)$", description="Content length")
+    tone: Optional[Literal["professional", "casual", "friendly", "formal", "enthusiastic", "urgent"]] = Field(None, description="Content tone")
+    length: Optional[Literal["short", "medium", "long"]] = Field(None, description="Content length")
     target_audience: Optional[str] = Field(None, description="Target audience description")
     
     # Context and examples
@@ -27,7 +27,7 @@ class AIGenerationRequest(BaseModel):
     variables: Optional[Dict[str, Any]] = Field(None, description="Template variables")
     
     # AI model preferences
-    model: Optional[str] = Field(None, regex="^(gpt-4|gpt-3.5-turbo|claude-3-sonnet|claude-3-opus)$", description="AI model to use")
+    model: Optional[Literal["gpt-4", "gpt-3.5-turbo", "claude-3-sonnet", "claude-3-opus"]] = Field(None, description="AI model to use")
     temperature: Optional[float] = Field(0.7, ge=0.0, le=2.0, description="Creativity level")
     max_tokens: Optional[int] = Field(1000, ge=1, le=4000, description="Maximum tokens to generate")
 
@@ -57,7 +57,7 @@ class AIGenerationResponse(BaseModel):
 class AIContentAnalysis(BaseModel):
     """AI content analysis request schema."""
     content: str = Field(..., description="Content to analyze")
-    analysis_type: str = Field(..., regex="^(readability|sentiment|spam|engagement|seo)$", description="Type of analysis")
+    analysis_type: Literal["readability", "sentiment", "spam", "engagement", "seo"] = Field(..., description="Type of analysis")
     
     # Analysis parameters
     language: Optional[str] = Field("en", description="Content language")
@@ -103,7 +103,7 @@ class AIContentAnalysisResponse(BaseModel):
 class AITemplateGeneration(BaseModel):
     """AI template generation request schema."""
     template_name: str = Field(..., description="Template name")
-    template_type: str = Field(..., regex="^(newsletter|promotional|transactional|welcome|follow-up)$", description="Template type")
+    template_type: Literal["newsletter", "promotional", "transactional", "welcome", "follow-up"] = Field(..., description="Template type")
     
     # Template parameters
     industry: Optional[str] = Field(None, description="Industry or business type")
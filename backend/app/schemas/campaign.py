@@ -2,8 +2,10 @@
 Campaign schemas for campaign management and operations.
 """
 
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, EmailStr
+import uuid
+from enum import Enum
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, EmailStr, field_validator
 from datetime import datetime
 
 
@@ -13,7 +15,7 @@ class CampaignBase(BaseModel):
     description: Optional[str] = Field(None, description="Campaign description")
     subject: str = Field(..., min_length=1, max_length=255, description="Email subject line")
     content: str = Field(..., min_length=1, description="Email content")
-    type: str = Field(..., regex="^(newsletter|promotional|transactional|automated)$", description="Campaign type")
+    type: Literal["newsletter", "promotional", "transactional", "automated"] = Field(..., description="Campaign type")
     sender_name: str = Field(..., min_length=1, max_length=100, description="Sender name")
     sender_email: EmailStr = Field(..., description="Sender email address")
     scheduled_at: Optional[datetime] = Field(None, description="Scheduled send time")
@@ -37,19 +39,25 @@ class CampaignUpdate(BaseModel):
     sender_email: Optional[EmailStr] = Field(None, description="Sender email address")
     scheduled_at: Optional[datetime] = Field(None, description="Scheduled send time")
     tags: Optional[List[str]] = Field(None, description="Campaign tags")
-    status: Optional[str] = Field(None, regex="^(draft|scheduled|sending|sent|paused)$", description="Campaign status")
+    status: Optional[Literal["draft", "scheduled", "sending", "sent", "paused"]] = Field(None, description="Campaign status")
 
 
 class CampaignResponse(CampaignBase):
-    """Campaign response schema."""
+    """Campaign response schema, validated from Campaign rows."""
     id: str = Field(..., description="Campaign ID")
     user_id: str = Field(..., description="User ID")
     status: str = Field(..., description="Campaign status")
     html_content: Optional[str] = Field(None, description="HTML content")
-    plain_text_content: Optional[str] = Field(None, description="Plain text content")
+    plain_text_content: Optional[str] = Field(None, validation_alias=AliasChoices("plain_text_content", "text_content"), description="Plain text content")
+    
+    # Campaign columns named differently from the request fields
+    content: Optional[str] = Field(None, validation_alias=AliasChoices("content", "html_content"), description="Email content")
+    type: str = Field(..., validation_alias=AliasChoices("type", "campaign_type"), description="Campaign type")
+    sender_name: str = Field(..., validation_alias=AliasChoices("sender_name", "from_name"), description="Sender name")
+    sender_email: str = Field(..., validation_alias=AliasChoices("sender_email", "from_email"), description="Sender email address")
     
     # Statistics
-    total_recipients: int = Field(..., description="Total recipients")
+    total_recipients: int = Field(..., validation_alias=AliasChoices("total_recipients", "recipient_count"), description="Total recipients")
     sent_count: int = Field(..., description="Number of emails sent")
     opened_count: int = Field(..., description="Number of emails opened")
     clicked_count: int = Field(..., description="Number of emails clicked")
@@ -66,8 +74,19 @@ class CampaignResponse(CampaignBase):
     updated_at: datetime = Field(..., description="Last update date")
     sent_at: Optional[datetime] = Field(None, description="Send date")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+    
+    @field_validator("id", "user_id", mode="before")
+    @classmethod
+    def _uuid_to_str(cls, value: Any) -> Any:
+        """Primary and foreign keys load as UUID objects."""
+        return str(value) if isinstance(value, uuid.UUID) else value
+    
+    @field_validator("status", "type", mode="before")
+    @classmethod
+    def _enum_to_value(cls, value: Any) -> Any:
+        """Native enum columns load as enum members."""
+        return value.value if isinstance(value, Enum) else value
 
 
 class CampaignList(BaseModel):
@@ -77,6 +96,9 @@ class CampaignList(BaseModel):
     page: int = Field(..., description="Current page number")
     size: int = Field(..., description="Number of campaigns per page")
     pages: int = Field(..., description="Total number of pages")
+    has_next: bool = Field(False, description="Whether there is a next page")
+    has_prev: bool = Field(False, description="Whether there is a previous page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for fetching the next page")
 
 
 class CampaignStats(BaseModel):
@@ -137,13 +159,12 @@ class CampaignRecipientResponse(BaseModel):
     last_opened_at: Optional[datetime] = Field(None, description="Last opened date")
     last_clicked_at: Optional[datetime] = Field(None, description="Last clicked date")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CampaignAction(BaseModel):
     """Campaign action schema."""
-    action: str = Field(..., regex="^(send|pause|resume|cancel|duplicate)$", description="Action to perform")
+    action: Literal["send", "pause", "resume", "cancel", "duplicate"] = Field(..., description="Action to perform")
     scheduled_at: Optional[datetime] = Field(None, description="Scheduled time for send action")
 
 
@@ -2,7 +2,9 @@
 Common Pydantic schemas for API responses and error handling.
 """
 
-from typing import Any, Generic, List, Optional, TypeVar
+import base64
+import uuid
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -27,6 +29,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pages: int = Field(..., description="Total number of pages")
     has_next: bool = Field(..., description="Whether there is a next page")
     has_prev: bool = Field(..., description="Whether there is a previous page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for fetching the next page")
 
 
 class ErrorResponse(BaseModel):
@@ -42,8 +45,21 @@ class PaginationParams(BaseModel):
     """Pagination parameters for API requests."""
     page: int = Field(1, ge=1, description="Page number")
     size: int = Field(10, ge=1, le=100, description="Number of items per page")
+    cursor: Optional[str] = Field(None, description="Opaque cursor from a previous page; overrides page")
     sort_by: Optional[str] = Field(None, description="Field to sort by")
-    sort_order: Optional[str] = Field("asc", regex="^(asc|desc)$", description="Sort order")
+    sort_order: Optional[str] = Field("asc", pattern="^(asc|desc)$", description="Sort order")
+
+
+def encode_cursor(created_at: datetime, item_id: Any) -> str:
+    """Encode a row's (created_at, id) sort key as an opaque pagination cursor."""
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed."""
+    created_at, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), uuid.UUID(item_id)
 
 
 class SearchParams(BaseModel):
@@ -3,7 +3,7 @@ User schemas for user management and profile operations.
 """
 
 from typing import Optional, List
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from datetime import datetime
 
 
@@ -45,8 +45,7 @@ class UserResponse(UserBase):
     created_at: datetime = Field(..., description="Account creation date")
     updated_at: datetime = Field(..., description="Last update date")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserList(BaseModel):
@@ -73,8 +72,7 @@ class UserProfile(BaseModel):
     created_at: datetime = Field(..., description="Account creation date")
     last_login: Optional[datetime] = Field(None, description="Last login date")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserStats(BaseModel):
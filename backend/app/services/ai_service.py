@@ -55,14 +55,14 @@ class AIService:
             model=settings.AI_MODEL,
             temperature=settings.AI_TEMPERATURE,
             max_tokens=settings.AI_MAX_TOKENS,
-            api_key=settings.OPENAI_API_KEY
+            api_key=settings.secrets.OPENAI_API_KEY
         )
         
         self.claude_client = ChatAnthropic(
             model="claude-3-sonnet-20240229",
             temperature=0.7,
             max_tokens=2000,
-            api_key=settings.ANTHROPIC_API_KEY
+            api_key=settings.secrets.ANTHROPIC_API_KEY
         )
         
         # Initialize memory for conversation context
@@ -27,15 +27,15 @@ class EmailService:
     def _setup_clients(self):
         """Setup email clients based on configuration."""
         # Setup SendGrid if API key is provided
-        if settings.SENDGRID_API_KEY:
-            self.sendgrid_client = SendGridAPIClient(api_key=settings.SENDGRID_API_KEY)
+        if settings.secrets.SENDGRID_API_KEY:
+            self.sendgrid_client = SendGridAPIClient(api_key=settings.secrets.SENDGRID_API_KEY)
         
         # Setup SMTP configuration
         self.smtp_config = {
             "host": settings.SMTP_HOST,
             "port": settings.SMTP_PORT,
             "username": settings.SMTP_USER,
-            "password": settings.SMTP_PASSWORD,
+            "password": settings.secrets.SMTP_PASSWORD,
             "use_tls": settings.SMTP_TLS,
             "use_ssl": settings.SMTP_SSL
         }
@@ -372,6 +372,7 @@ class EmailService:
                     results["failed"] += 1
                     results["errors"].append({
                         "email": recipient["email"],
+                        "recipient_id": recipient.get("id"),
                         "error": result.get("error", "Unknown error")
                     })
                 
@@ -379,6 +380,7 @@ class EmailService:
                 results["failed"] += 1
                 results["errors"].append({
                     "email": recipient.get("email", "unknown"),
+                    "recipient_id": recipient.get("id"),
                     "error": str(e)
                 })
         
@@ -0,0 +1,14 @@
+"""
+Background tasks executed by Celery workers.
+"""
+
+from .campaigns import send_campaign_task, send_batch
+from .events import enqueue_email_events, flush_email_events, insert_email_events
+
+__all__ = [
+    "send_campaign_task",
+    "send_batch",
+    "enqueue_email_events",
+    "flush_email_events",
+    "insert_email_events",
+]
@@ -0,0 +1,226 @@
+"""
+Celery tasks for sending email campaigns.
+"""
+
+from typing import Any, List
+from loguru import logger
+from sqlalchemy import exists, func, select, update
+
+from app.core.celery import celery_app
+from app.core.database import AsyncSessionLocal, engine
+from app.models.campaign import Campaign, CampaignRecipient, CampaignStatus, RecipientStatus, refresh_campaign_analytics_view
+from app.models.recipient import Recipient
+from app.models.user import increment_user_usage
+from app.services.email_service import email_service
+from app.tasks.utils import run_async
+
+# Number of recipients handled by a single send_batch task
+SEND_BATCH_SIZE = 500
+
+
+async def _queue_pending_batches(campaign_id: str) -> int:
+    """
+    Stream pending campaign recipient IDs and queue a send_batch per chunk.
+    
+    IDs are read through a server-side cursor so memory stays O(batch)
+    regardless of campaign size.
+    """
+    queued = 0
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(
+            select(CampaignRecipient.id)
+            .where(
+                CampaignRecipient.campaign_id == campaign_id,
+                CampaignRecipient.status == RecipientStatus.PENDING
+            )
+            .execution_options(yield_per=SEND_BATCH_SIZE)
+        )
+        async for partition in result.partitions(SEND_BATCH_SIZE):
+            send_batch.delay(campaign_id, [str(recipient_id) for recipient_id in partition])
+            queued += len(partition)
+    return queued
+
+
+async def _send_batch(campaign_id: str, campaign_recipient_ids: List[str]) -> dict:
+    """
+    Send campaign emails to the still-pending recipients of a batch.
+    
+    Rows are claimed (pending -> sending) and committed before anything is
+    sent, so a duplicate or retried batch can't email them again, and no
+    transaction stays open across the provider round-trip. Outcomes are
+    recorded in a second short transaction.
+    """
+    async with AsyncSessionLocal() as session:
+        campaign = await session.get(Campaign, campaign_id)
+        if not campaign or campaign.status != CampaignStatus.SENDING:
+            return {"sent": 0, "failed": 0, "errors": []}
+        
+        result = await session.execute(
+            update(CampaignRecipient)
+            .where(
+                CampaignRecipient.campaign_id == campaign_id,
+                CampaignRecipient.id.in_(campaign_recipient_ids),
+                CampaignRecipient.status == RecipientStatus.PENDING,
+                Recipient.id == CampaignRecipient.recipient_id
+            )
+            .values(status=RecipientStatus.SENDING)
+            .returning(CampaignRecipient.id, Recipient.id, Recipient.email, Recipient.first_name, Recipient.last_name)
+        )
+        rows = result.all()
+        await session.commit()
+    
+    if not rows:
+        # Everything in the batch was already handled; this may have been the
+        # last batch to look, so the campaign still needs closing
+        await _complete_campaign_if_done(campaign_id)
+        return {"sent": 0, "failed": 0, "errors": []}
+    
+    # Delivery results are reported per Recipient; map back to our rows
+    campaign_recipient_by_recipient = {
+        str(recipient_id): campaign_recipient_id
+        for campaign_recipient_id, recipient_id, *_ in rows
+    }
+    recipients = [
+        {
+            "id": str(recipient_id),
+            "email": email,
+            "first_name": first_name or "",
+            "last_name": last_name or "",
+        }
+        for _, recipient_id, email, first_name, last_name in rows
+    ]
+    
+    try:
+        results = await email_service.send_bulk_campaign(
+            recipients=recipients,
+            subject=campaign.subject,
+            html_template=campaign.html_content,
+            text_template=campaign.text_content,
+            from_email=campaign.from_email,
+            from_name=campaign.from_name,
+            campaign_id=campaign_id,
+            batch_size=len(recipients)
+        )
+    except Exception:
+        # Nothing was reported sent; hand the rows back for the retry
+        await _release_claimed_recipients(list(campaign_recipient_by_recipient.values()))
+        raise
+    
+    failed_ids = {
+        campaign_recipient_by_recipient[error["recipient_id"]]
+        for error in results["errors"]
+        if error.get("recipient_id") in campaign_recipient_by_recipient
+    }
+    sent_ids = set(campaign_recipient_by_recipient.values()) - failed_ids
+    
+    async with AsyncSessionLocal() as session:
+        if sent_ids:
+            sent = await session.execute(
+                update(CampaignRecipient)
+                .where(
+                    CampaignRecipient.id.in_(sent_ids),
+                    CampaignRecipient.status == RecipientStatus.SENDING
+                )
+                .values(status=RecipientStatus.SENT, sent_at=func.now())
+            )
+            # Charged in the same transaction that marks the rows sent
+            await increment_user_usage(
+                session, campaign.user_id, emails_sent_this_month=sent.rowcount
+            )
+        if failed_ids:
+            await session.execute(
+                update(CampaignRecipient)
+                .where(
+                    CampaignRecipient.id.in_(failed_ids),
+                    CampaignRecipient.status == RecipientStatus.SENDING
+                )
+                .values(status=RecipientStatus.FAILED)
+            )
+        await session.commit()
+    
+    # Checked after our own commit, so whichever batch commits last sees
+    # every other batch's rows and closes the campaign
+    await _complete_campaign_if_done(campaign_id)
+    return results
+
+
+async def _release_claimed_recipients(campaign_recipient_ids: List[Any]) -> None:
+    """Return claimed rows to pending so a retried batch can send them."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(CampaignRecipient)
+            .where(
+                CampaignRecipient.id.in_(campaign_recipient_ids),
+                CampaignRecipient.status == RecipientStatus.SENDING
+            )
+            .values(status=RecipientStatus.PENDING)
+        )
+        await session.commit()
+
+
+async def _complete_campaign_if_done(campaign_id: str) -> bool:
+    """Mark a sending campaign as sent once no recipient is pending or mid-send."""
+    still_pending = exists().where(
+        CampaignRecipient.campaign_id == campaign_id,
+        CampaignRecipient.status.in_([RecipientStatus.PENDING, RecipientStatus.SENDING])
+    )
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Campaign)
+            .where(
+                Campaign.id == campaign_id,
+                Campaign.status == CampaignStatus.SENDING,
+                ~still_pending
+            )
+            .values(status=CampaignStatus.SENT, sent_at=func.now())
+        )
+        await session.commit()
+        return result.rowcount > 0
+
+
+async def _refresh_campaign_analytics() -> None:
+    """Recompute the campaign analytics materialized view."""
+    async with engine.begin() as conn:
+        await refresh_campaign_analytics_view(conn)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def send_campaign_task(self, campaign_id: str, user_id: str) -> int:
+    """Fan a campaign send out into recipient batches across workers."""
+    try:
+        logger.info(f"Starting campaign send: {campaign_id}")
+        
+        queued = run_async(_queue_pending_batches(campaign_id))
+        if queued == 0:
+            # No batch will run to close the campaign
+            run_async(_complete_campaign_if_done(campaign_id))
+        
+        logger.info(f"Campaign send queued: {campaign_id} ({queued} recipients)")
+        return queued
+        
+    except Exception as exc:
+        logger.error(f"Error queueing campaign send: {str(exc)}")
+        raise self.retry(countdown=60, exc=exc)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def send_batch(self, campaign_id: str, campaign_recipient_ids: List[str]) -> dict:
+    """Send one batch of campaign emails."""
+    try:
+        results = run_async(_send_batch(campaign_id, campaign_recipient_ids))
+        return {"sent": results["sent"], "failed": results["failed"]}
+        
+    except Exception as exc:
+        logger.error(f"Error sending campaign batch: {str(exc)}")
+        raise self.retry(countdown=60, exc=exc)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def refresh_campaign_analytics(self) -> None:
+    """Refresh precomputed campaign analytics for dashboards."""
+    try:
+        run_async(_refresh_campaign_analytics())
+        
+    except Exception as exc:
+        logger.error(f"Error refreshing campaign analytics: {str(exc)}")
+        raise self.retry(countdown=60, exc=exc)
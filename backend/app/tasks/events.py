@@ -0,0 +1,186 @@
+"""
+Celery tasks for ingesting email tracking events.
+
+Webhook handlers append events to a Redis Stream with
+``enqueue_email_events``; ``flush_email_events`` drains the stream in
+batches and bulk-loads them into ``email_events`` with COPY. Events
+Postgres rejects are moved to the ``events:stream:dead`` stream. Code that
+already holds a session can write rows directly with
+``insert_email_events``; neither path builds ``EmailEvent`` objects.
+"""
+
+import socket
+import uuid
+from datetime import date, datetime
+from typing import List, Tuple
+
+import asyncpg
+import orjson
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.celery import celery_app
+from app.core.database import engine
+from app.core.redis import EventStream, RedisClient
+from app.models.analytics import EmailEvent, create_email_event_partitions
+from app.tasks.utils import run_async
+
+# Redis Stream and consumer group holding email events awaiting COPY
+EMAIL_EVENT_STREAM = "events:stream"
+EMAIL_EVENT_GROUP = "email-events"
+
+# Events read per XREADGROUP and copied per COPY
+EVENT_BATCH_SIZE = 1000
+
+# Upper bound on batches drained by one task run
+MAX_BATCHES_PER_FLUSH = 50
+
+# Entries another consumer has held unacknowledged this long are taken over
+EVENT_CLAIM_IDLE_MS = 60_000
+
+# Errors raised for the rows themselves (bad values, constraint or missing
+# partition); ValueError covers asyncpg's client-side encoding errors.
+# Anything else, like a dropped connection, leaves the batch pending.
+COPY_ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError, ValueError)
+
+# id is left to its gen_random_uuid() server default
+EMAIL_EVENT_COLUMNS = [
+    "campaign_id", "recipient_id", "event_type", "event_data",
+    "ip_address", "user_agent", "location", "country", "event_time",
+]
+
+
+async def enqueue_email_events(redis_client: RedisClient, events: List[dict]) -> int:
+    """Queue email events for bulk ingestion in one pipelined round-trip."""
+    stream = EventStream(redis_client, EMAIL_EVENT_STREAM, EMAIL_EVENT_GROUP)
+    return await stream.add_batch(events)
+
+
+async def insert_email_events(session: AsyncSession, rows: List[dict]) -> None:
+    """Insert email event rows as Core executemany batches, skipping the ORM."""
+    for start in range(0, len(rows), EVENT_BATCH_SIZE):
+        await session.execute(
+            insert(EmailEvent.__table__), rows[start:start + EVENT_BATCH_SIZE]
+        )
+
+
+def _to_record(event: dict, now: datetime) -> tuple:
+    """Convert a queued event into an ``email_events`` row for COPY."""
+    event_time = event.get("event_time")
+    location = event.get("location") or {}
+    return (
+        uuid.UUID(event["campaign_id"]),
+        uuid.UUID(event["recipient_id"]),
+        event["event_type"],
+        orjson.dumps(event.get("event_data") or {}).decode(),
+        event.get("ip_address"),
+        event.get("user_agent"),
+        orjson.dumps(location).decode(),
+        event.get("country") or location.get("country"),
+        datetime.fromisoformat(event_time) if event_time else now,
+    )
+
+
+async def _copy_records(records: List[tuple]) -> None:
+    """Bulk-load rows into ``email_events`` with asyncpg's COPY."""
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "email_events", records=records, columns=EMAIL_EVENT_COLUMNS
+        )
+
+
+async def _copy_or_bisect(rows: List[Tuple[bytes, dict, tuple]]) -> List[Tuple[bytes, dict, str]]:
+    """
+    COPY (entry id, event, record) rows, splitting a rejected batch in half
+    until the offending rows are isolated.
+    
+    Returns the rejected rows as (entry id, event, error); every other row
+    is committed.
+    """
+    try:
+        await _copy_records([record for _, _, record in rows])
+        return []
+    except COPY_ROW_ERRORS as exc:
+        if len(rows) == 1:
+            entry_id, event, _ = rows[0]
+            return [(entry_id, event, str(exc))]
+    
+    middle = len(rows) // 2
+    return await _copy_or_bisect(rows[:middle]) + await _copy_or_bisect(rows[middle:])
+
+
+async def _flush_email_events(consumer: str) -> int:
+    """Drain queued email events into Postgres, one COPY per batch."""
+    redis_client = RedisClient()
+    await redis_client.connect()
+    try:
+        stream = EventStream(redis_client, EMAIL_EVENT_STREAM, EMAIL_EVENT_GROUP)
+        await stream.ensure_group()
+        # Adopt batches stranded by consumers that died before acknowledging
+        await stream.claim_idle(consumer, EVENT_CLAIM_IDLE_MS, count=EVENT_BATCH_SIZE)
+        
+        flushed = 0
+        for _ in range(MAX_BATCHES_PER_FLUSH):
+            # Retry this consumer's unacknowledged entries before new ones
+            entries = await stream.read_batch(consumer, count=EVENT_BATCH_SIZE, pending=True)
+            if not entries:
+                entries = await stream.read_batch(consumer, count=EVENT_BATCH_SIZE)
+            if not entries:
+                break
+            
+            now = datetime.utcnow()
+            rows = []
+            rejected = []
+            for entry_id, event in entries:
+                try:
+                    rows.append((entry_id, event, _to_record(event, now)))
+                except (KeyError, TypeError, ValueError, AttributeError) as exc:
+                    rejected.append((entry_id, event, f"invalid event: {exc!r}"))
+            
+            if rows:
+                rejected.extend(await _copy_or_bisect(rows))
+            if rejected:
+                logger.error(f"Dead-lettering {len(rejected)} email events")
+                await stream.dead_letter(rejected)
+            
+            # Only acknowledged once the rows are committed; a connection
+            # failure leaves the batch pending for the next run
+            rejected_ids = {entry_id for entry_id, _, _ in rejected}
+            await stream.ack([entry_id for entry_id, _ in entries if entry_id not in rejected_ids])
+            flushed += len(entries) - len(rejected)
+        return flushed
+    finally:
+        await redis_client.disconnect()
+
+
+async def _create_upcoming_partitions() -> None:
+    """Create daily email_events partitions for the coming week."""
+    async with engine.begin() as conn:
+        await create_email_event_partitions(conn, date.today())
+
+
+@celery_app.task(bind=True, max_retries=3)
+def maintain_email_event_partitions(self) -> None:
+    """Keep a week of daily email_events partitions ahead of incoming events."""
+    try:
+        run_async(_create_upcoming_partitions())
+        
+    except Exception as exc:
+        logger.error(f"Error creating email event partitions: {str(exc)}")
+        raise self.retry(countdown=300, exc=exc)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def flush_email_events(self) -> int:
+    """Bulk-load queued email events into the database."""
+    try:
+        flushed = run_async(_flush_email_events(socket.gethostname()))
+        if flushed:
+            logger.info(f"Flushed {flushed} email events")
+        return flushed
+    
+    except Exception as exc:
+        logger.error(f"Error flushing email events: {str(exc)}")
+        raise self.retry(countdown=10, exc=exc)
@@ -0,0 +1,19 @@
+"""
+Helpers shared by the Celery task modules.
+"""
+
+import asyncio
+from typing import Any, Coroutine
+
+from app.core.database import engine
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Run a coroutine from a sync Celery task on a fresh event loop."""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            # Pooled connections are bound to the loop that created them
+            await engine.dispose()
+    return asyncio.run(runner())
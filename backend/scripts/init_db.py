@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+One-off database setup for AI Email Campaign Writer
+Creates tables, partitions, triggers and materialized views; run once per
+deploy before starting the API and workers, never from application startup
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Make the app package importable when run as `python scripts/init_db.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import close_db, init_db  # noqa: E402
+
+
+async def main() -> None:
+    """Run the schema setup and release the pool."""
+    try:
+        await init_db()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    print("🚀 AI Email Campaign Writer - Database Setup")
+    asyncio.run(main())
+    print("✅ Database initialized")
@@ -0,0 +1,30 @@
+"""
+Shared pytest fixtures.
+"""
+
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.core.redis import RedisClient
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    """A RedisClient connected to REDIS_URL; skips the test when Redis is unreachable."""
+    client = RedisClient()
+    try:
+        await client.connect()
+    except Exception:
+        pytest.skip("Redis is not available")
+    try:
+        yield client
+    finally:
+        await client.disconnect()
+
+
+@pytest.fixture
+def redis_key():
+    """A key unique to the test, so runs never see each other's state."""
+    return f"test:{uuid.uuid4().hex}"
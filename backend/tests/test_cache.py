@@ -0,0 +1,26 @@
+"""
+Tests for batched Cache reads and writes.
+
+These run against a real Redis at REDIS_URL and are skipped when it is
+unreachable.
+"""
+
+import pytest
+
+from app.core.redis import Cache
+
+pytestmark = [pytest.mark.integration, pytest.mark.asyncio]
+
+
+async def test_mset_round_trips_through_mget(redis_client, redis_key):
+    cache = Cache(redis_client)
+    keys = [f"{redis_key}:{n}" for n in range(3)]
+    try:
+        assert await cache.mset(dict(zip(keys, [{"opens": 1}, [1, 2], "plain"])), expire=60)
+        
+        assert await cache.mget(keys + [f"{redis_key}:missing"]) == [
+            {"opens": 1}, [1, 2], "plain", None
+        ]
+        assert 0 < await redis_client.client.ttl(keys[0]) <= 60
+    finally:
+        await redis_client.client.delete(*keys)
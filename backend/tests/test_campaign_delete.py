@@ -0,0 +1,58 @@
+"""
+Tests that deleting a campaign cascades to its dependent rows in Postgres.
+"""
+
+import pytest
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.core.database import Base
+from app.models.campaign import CAMPAIGN_CHILD_FOREIGN_KEYS, apply_campaign_foreign_key_actions
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+    
+    async def execute(self, statement):
+        self.statements.append(str(statement))
+
+
+def _campaign_foreign_keys():
+    return {
+        table.name: foreign_key.ondelete
+        for table in Base.metadata.tables.values()
+        for foreign_key in table.foreign_keys
+        if foreign_key.target_fullname == "campaigns.id"
+    }
+
+
+@pytest.mark.unit
+def test_every_campaign_child_declares_its_delete_action():
+    foreign_keys = _campaign_foreign_keys()
+    
+    assert foreign_keys
+    for table, ondelete in foreign_keys.items():
+        assert ondelete == CAMPAIGN_CHILD_FOREIGN_KEYS[table], table
+
+
+@pytest.mark.unit
+def test_copy_examples_are_detached_not_deleted():
+    pytest.importorskip("pgvector")
+    from app.models.copy_corpus import CopyCorpus
+    
+    (foreign_key,) = CopyCorpus.__table__.c.campaign_id.foreign_keys
+    assert foreign_key.ondelete == "SET NULL"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_existing_constraints_are_recreated_with_their_action():
+    conn = RecordingConnection()
+    
+    await apply_campaign_foreign_key_actions(conn)
+    
+    assert len(conn.statements) == len(CAMPAIGN_CHILD_FOREIGN_KEYS)
+    recipients = conn.statements[0]
+    assert "conname = 'campaign_recipients_campaign_id_fkey' AND confdeltype <> 'c'" in recipients
+    assert "REFERENCES campaigns (id) ON DELETE CASCADE" in recipients
+    assert "ON DELETE SET NULL" in conn.statements[-1]
@@ -0,0 +1,95 @@
+"""
+Tests for guarded campaign status transitions.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import exists
+from sqlalchemy.dialects import postgresql
+
+from app.models.campaign import Campaign, CampaignRecipient, transition_campaign
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+    
+    def first(self):
+        return self._row
+
+
+class RecordingSession:
+    """Captures executed statements and answers with a canned row."""
+    
+    def __init__(self, row=None):
+        self.row = row
+        self.statements = []
+    
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result(self.row)
+
+
+def _where_sql(statement) -> str:
+    return str(statement.whereclause.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_transition_guards_owner_and_previous_status():
+    campaign_id, user_id = uuid.uuid4(), uuid.uuid4()
+    session = RecordingSession(row=(campaign_id, "sending"))
+    
+    row = await transition_campaign(
+        session, campaign_id, user_id, ["draft"], {"status": "sending"}
+    )
+    
+    assert row == (campaign_id, "sending")
+    (statement,) = session.statements
+    assert statement.table.name == "campaigns"
+    where = _where_sql(statement)
+    assert f"campaigns.id = '{campaign_id}'" in where
+    assert f"campaigns.user_id = '{user_id}'" in where
+    assert "campaigns.status IN ('draft')" in where
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_transition_allows_several_previous_statuses():
+    session = RecordingSession(row=(uuid.uuid4(), "paused"))
+    
+    await transition_campaign(
+        session, uuid.uuid4(), uuid.uuid4(), ["sending", "scheduled"], {"status": "paused"}
+    )
+    
+    assert "campaigns.status IN ('sending', 'scheduled')" in _where_sql(session.statements[0])
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_transition_adds_extra_conditions():
+    session = RecordingSession(row=(uuid.uuid4(), "sending"))
+    has_recipients = exists().where(CampaignRecipient.campaign_id == Campaign.id)
+    
+    await transition_campaign(
+        session, uuid.uuid4(), uuid.uuid4(), ["draft"], {"status": "sending"}, has_recipients
+    )
+    
+    where = _where_sql(session.statements[0])
+    assert "EXISTS" in where
+    assert "campaign_recipients.campaign_id = campaigns.id" in where
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rejected_transition_returns_none():
+    session = RecordingSession(row=None)
+    
+    row = await transition_campaign(
+        session, uuid.uuid4(), uuid.uuid4(), ["paused"], {"status": "sending"}
+    )
+    
+    assert row is None
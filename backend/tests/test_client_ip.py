@@ -0,0 +1,61 @@
+"""
+Tests for resolving the client address behind trusted proxies.
+"""
+
+import ipaddress
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import middleware
+from app.core.middleware import get_client_ip
+
+
+@pytest.fixture
+def trusted_proxies(monkeypatch):
+    monkeypatch.setattr(
+        middleware, "_TRUSTED_PROXY_NETWORKS", (ipaddress.ip_network("10.0.0.0/8"),)
+    )
+    middleware._is_trusted_proxy.cache_clear()
+    yield
+    middleware._is_trusted_proxy.cache_clear()
+
+
+def _request(peer, forwarded_for=None):
+    headers = {"x-forwarded-for": forwarded_for} if forwarded_for is not None else {}
+    return SimpleNamespace(client=SimpleNamespace(host=peer), headers=headers)
+
+
+@pytest.mark.unit
+def test_header_ignored_without_trusted_proxies():
+    assert get_client_ip(_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+@pytest.mark.unit
+def test_header_ignored_from_untrusted_peer(trusted_proxies):
+    assert get_client_ip(_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+@pytest.mark.unit
+def test_rightmost_untrusted_hop_is_the_client(trusted_proxies):
+    request = _request("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.1")
+    
+    assert get_client_ip(request) == "198.51.100.1"
+
+
+@pytest.mark.unit
+def test_spoofed_leftmost_entries_do_not_change_the_key(trusted_proxies):
+    first = get_client_ip(_request("10.0.0.2", "1.1.1.1, 198.51.100.1"))
+    second = get_client_ip(_request("10.0.0.2", "2.2.2.2, 198.51.100.1"))
+    
+    assert first == second == "198.51.100.1"
+
+
+@pytest.mark.unit
+def test_all_trusted_hops_fall_back_to_leftmost(trusted_proxies):
+    assert get_client_ip(_request("10.0.0.2", "10.0.0.5, 10.0.0.1")) == "10.0.0.5"
+
+
+@pytest.mark.unit
+def test_empty_header_falls_back_to_peer(trusted_proxies):
+    assert get_client_ip(_request("10.0.0.2", " , ")) == "10.0.0.2"
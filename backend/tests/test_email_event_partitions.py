@@ -0,0 +1,54 @@
+"""
+Tests for creating daily email_events partitions.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.models.analytics import create_email_event_partitions
+
+
+class SavepointConnection:
+    """Records statements per savepoint and fails the ones for chosen partitions."""
+    
+    def __init__(self, failing_tables):
+        self.failing_tables = failing_tables
+        self.committed = []
+        self.rolled_back = []
+        self._savepoint = None
+    
+    @asynccontextmanager
+    async def begin_nested(self):
+        self._savepoint = []
+        try:
+            yield
+        except Exception:
+            self.rolled_back.extend(self._savepoint)
+            raise
+        else:
+            self.committed.extend(self._savepoint)
+        finally:
+            self._savepoint = None
+    
+    async def execute(self, statement):
+        sql = str(statement)
+        if any(table in sql for table in self.failing_tables):
+            self._savepoint.append(sql)
+            raise DBAPIError(sql, {}, Exception("updated partition constraint for default partition would be violated"))
+        (self._savepoint if self._savepoint is not None else self.committed).append(sql)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_conflicting_day_is_skipped_without_losing_the_others():
+    conn = SavepointConnection(failing_tables={"email_events_20260102"})
+    
+    await create_email_event_partitions(conn, date(2026, 1, 1), days=3)
+    
+    created = [sql.split()[5] for sql in conn.committed]
+    assert created == ["email_events_default", "email_events_20260101", "email_events_20260103"]
+    assert len(conn.rolled_back) == 1
+    assert "email_events_20260102" in conn.rolled_back[0]
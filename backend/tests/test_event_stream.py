@@ -0,0 +1,52 @@
+"""
+Tests for the Redis Streams event queue's recovery paths.
+
+These run against a real Redis at REDIS_URL and are skipped when it is
+unreachable.
+"""
+
+import pytest
+
+from app.core.redis import EventStream
+
+pytestmark = [pytest.mark.integration, pytest.mark.asyncio]
+
+
+async def _stream(redis_client, redis_key) -> EventStream:
+    stream = EventStream(redis_client, redis_key, "test-group")
+    await stream.ensure_group()
+    return stream
+
+
+async def test_dead_letter_moves_and_acknowledges_entries(redis_client, redis_key):
+    stream = await _stream(redis_client, redis_key)
+    try:
+        await stream.add_batch([{"n": 1}, {"n": 2}])
+        entries = await stream.read_batch("worker-a")
+        bad_id, bad_event = entries[0]
+        
+        assert await stream.dead_letter([(bad_id, bad_event, "rejected")]) == 1
+        
+        pending = await stream.read_batch("worker-a", pending=True)
+        assert [entry_id for entry_id, _ in pending] == [entries[1][0]]
+        dead = await redis_client.client.xrange(stream.dead_letter_name)
+        assert len(dead) == 1
+        assert dead[0][1][b"id"] == bad_id
+        assert dead[0][1][b"error"] == b"rejected"
+    finally:
+        await redis_client.client.delete(redis_key, stream.dead_letter_name)
+
+
+async def test_claim_idle_takes_over_another_consumers_entries(redis_client, redis_key):
+    stream = await _stream(redis_client, redis_key)
+    try:
+        await stream.add_batch([{"n": 1}])
+        stranded = await stream.read_batch("worker-a")
+        
+        assert await stream.claim_idle("worker-b", min_idle_ms=0) == 1
+        
+        pending = await stream.read_batch("worker-b", pending=True)
+        assert [entry_id for entry_id, _ in pending] == [stranded[0][0]]
+        assert await stream.read_batch("worker-a", pending=True) == []
+    finally:
+        await redis_client.client.delete(redis_key)
@@ -0,0 +1,29 @@
+"""
+Tests for notification template compilation.
+"""
+
+import pytest
+
+from app.models.notification import _KeepMissing, _compile_template
+
+
+def _render(template: str, **values) -> str:
+    return _compile_template(template).format_map(_KeepMissing(values))
+
+
+@pytest.mark.unit
+def test_placeholders_are_filled():
+    assert _render("Hi {first_name}, {campaign} sent", first_name="Ada", campaign="Launch") == (
+        "Hi Ada, Launch sent"
+    )
+
+
+@pytest.mark.unit
+def test_missing_placeholders_are_kept():
+    assert _render("Hi {first_name}") == "Hi {first_name}"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("template", ["{0} opens", "{} opens", "{1x} opens", "{ name } opens"])
+def test_non_identifier_braces_stay_literal(template):
+    assert _render(template, name="Ada") == template
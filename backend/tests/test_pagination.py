@@ -0,0 +1,51 @@
+"""
+Tests for opaque keyset pagination cursors.
+"""
+
+import base64
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.schemas.common import decode_cursor, encode_cursor
+
+
+@pytest.mark.unit
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    item_id = uuid.uuid4()
+    
+    assert decode_cursor(encode_cursor(created_at, item_id)) == (created_at, item_id)
+
+
+@pytest.mark.unit
+def test_cursor_round_trip_naive_datetime():
+    created_at = datetime(2024, 1, 1)
+    item_id = uuid.uuid4()
+    
+    assert decode_cursor(encode_cursor(created_at, item_id)) == (created_at, item_id)
+
+
+@pytest.mark.unit
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime(2024, 5, 17, tzinfo=timezone.utc), uuid.uuid4())
+    
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"2024-05-17T09:30:15").decode(),
+        base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+        base64.urlsafe_b64encode(b"2024-05-17T09:30:15|not-a-uuid").decode(),
+        base64.urlsafe_b64encode(b"a|b|c").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,73 @@
+"""
+Tests for the Redis token bucket rate limit script.
+
+These run the Lua script against a real Redis at REDIS_URL and are
+skipped when it is unreachable.
+"""
+
+import pytest
+
+from app.core.redis import (
+    RATE_LIMIT_HOUR_EXCEEDED,
+    RATE_LIMIT_MINUTE_EXCEEDED,
+    RATE_LIMIT_OK,
+)
+
+pytestmark = [pytest.mark.integration, pytest.mark.asyncio]
+
+
+async def _consume(redis_client, key, per_minute, per_hour, times):
+    return [
+        await redis_client.consume_rate_limit(key, per_minute, per_hour)
+        for _ in range(times)
+    ]
+
+
+async def test_minute_bucket_admits_capacity_then_rejects(redis_client, redis_key):
+    try:
+        results = await _consume(redis_client, redis_key, 5, 100, 6)
+        
+        assert results == [RATE_LIMIT_OK] * 5 + [RATE_LIMIT_MINUTE_EXCEEDED]
+    finally:
+        await redis_client.delete(redis_key)
+
+
+async def test_hour_bucket_rejects_when_minute_has_room(redis_client, redis_key):
+    try:
+        results = await _consume(redis_client, redis_key, 100, 3, 4)
+        
+        assert results == [RATE_LIMIT_OK] * 3 + [RATE_LIMIT_HOUR_EXCEEDED]
+    finally:
+        await redis_client.delete(redis_key)
+
+
+async def test_rejected_requests_do_not_spend_tokens(redis_client, redis_key):
+    try:
+        await _consume(redis_client, redis_key, 2, 100, 5)
+        state = await redis_client.hgetall(redis_key)
+        
+        # Two admitted requests; the hour bucket only refilled by a fraction
+        assert 97 < float(state[b"h"]) < 99
+    finally:
+        await redis_client.delete(redis_key)
+
+
+async def test_buckets_are_per_key(redis_client, redis_key):
+    other_key = f"{redis_key}:other"
+    try:
+        await _consume(redis_client, redis_key, 1, 100, 2)
+        
+        assert await redis_client.consume_rate_limit(other_key, 1, 100) == RATE_LIMIT_OK
+    finally:
+        await redis_client.delete(redis_key)
+        await redis_client.delete(other_key)
+
+
+async def test_bucket_expires_after_an_hour(redis_client, redis_key):
+    try:
+        await redis_client.consume_rate_limit(redis_key, 5, 100)
+        ttl = await redis_client.client.pttl(redis_key)
+        
+        assert 0 < ttl <= 3_600_000
+    finally:
+        await redis_client.delete(redis_key)
@@ -0,0 +1,119 @@
+"""
+Tests for refresh token rotation and replay protection.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.redis import RedisClient
+from app.core.security import (
+    REFRESH_BLACKLIST_PREFIX,
+    consume_refresh_token,
+    create_token_pair,
+    generate_password_reset_token,
+    verify_refresh_token,
+    verify_token,
+)
+
+
+class InMemoryRedis:
+    """Just enough of redis.asyncio.Redis for SET NX EX."""
+    
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+    
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.expiry[key] = ex
+        return True
+
+
+class FailingRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+
+def _redis(client) -> RedisClient:
+    redis = RedisClient()
+    redis.client = client
+    return redis
+
+
+@pytest.mark.unit
+def test_verify_refresh_token_rejects_access_tokens():
+    access_token, refresh_token = create_token_pair("user-1")
+    
+    assert verify_refresh_token(access_token) is None
+    claims = verify_refresh_token(refresh_token)
+    assert claims["sub"] == "user-1"
+    assert claims["jti"]
+
+
+@pytest.mark.unit
+def test_verify_token_accepts_only_access_tokens():
+    access_token, refresh_token = create_token_pair("user-1")
+    
+    assert verify_token(access_token) == "user-1"
+    assert verify_token(refresh_token) is None
+    # The rejection is cached; a second lookup must not let it through
+    assert verify_token(refresh_token) is None
+    assert verify_token(generate_password_reset_token("user@example.com")) is None
+
+
+@pytest.mark.unit
+def test_token_pairs_get_distinct_jtis():
+    _, first = create_token_pair("user-1")
+    _, second = create_token_pair("user-1")
+    
+    assert verify_refresh_token(first)["jti"] != verify_refresh_token(second)["jti"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_refresh_token_cannot_be_replayed():
+    client = InMemoryRedis()
+    redis = _redis(client)
+    claims = verify_refresh_token(create_token_pair("user-1")[1])
+    
+    assert await consume_refresh_token(redis, claims) is True
+    assert await consume_refresh_token(redis, claims) is False
+    
+    key = f"{REFRESH_BLACKLIST_PREFIX}{claims['jti']}"
+    assert 0 < client.expiry[key] <= claims["exp"] - time.time() + 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_expired_refresh_token_is_not_consumed():
+    client = InMemoryRedis()
+    claims = {"sub": "user-1", "jti": "expired", "exp": time.time() - 1}
+    
+    assert await consume_refresh_token(_redis(client), claims) is False
+    assert client.values == {}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client", [None, FailingRedis()])
+async def test_refresh_fails_closed_without_redis(client):
+    claims = verify_refresh_token(create_token_pair("user-1")[1])
+    
+    assert await consume_refresh_token(_redis(client), claims) is False
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_have_one_winner(redis_client):
+    claims = verify_refresh_token(create_token_pair("user-1")[1])
+    try:
+        results = await asyncio.gather(
+            *(consume_refresh_token(redis_client, claims) for _ in range(10))
+        )
+        assert results.count(True) == 1
+    finally:
+        await redis_client.delete(f"{REFRESH_BLACKLIST_PREFIX}{claims['jti']}")